@@ -0,0 +1,183 @@
+# scripts/abnormal_returns.py
+"""
+Market-model abnormal returns
+Each event's alpha and beta against a benchmark (QQQ by default) are estimated
+over a pre-event window, for all events at once: the regressions only need
+window sums of x, y, xy, x² and y², which are differences of prefix sums over
+the flat price panel. Abnormal returns (AR) and cumulative abnormal returns
+(CAR) over the event windows come from the same prefix sums.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import config
+from table_store import read_table
+from event_tensor import daily_returns
+
+# Fetch the benchmark and add abnormal-return columns to earnings_analysis
+ABNORMAL_RETURNS = getattr(config, 'ABNORMAL_RETURNS', False)
+BENCHMARK_SYMBOL = getattr(config, 'BENCHMARK_SYMBOL', 'QQQ')
+# Estimation window: trading days of returns, ending ESTIMATION_GAP_DAYS before the pre-earnings window
+ESTIMATION_WINDOW_DAYS = getattr(config, 'ESTIMATION_WINDOW_DAYS', 120)
+ESTIMATION_GAP_DAYS = getattr(config, 'ESTIMATION_GAP_DAYS', 10)
+MIN_ESTIMATION_DAYS = getattr(config, 'MIN_ESTIMATION_DAYS', 60)
+
+BENCHMARK_TABLE = 'benchmark_prices'
+
+ABNORMAL_COLUMNS = [
+    'alpha_pct', 'beta', 'est_sigma_pct', 'est_days',
+    'abnormal_immediate_pct', 'abnormal_immediate_se_pct',
+    'car_pre_pct', 'car_post_pct', 'car_post_se_pct', 'car_total_pct'
+]
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def load_benchmark(benchmark_df, conn, symbol=BENCHMARK_SYMBOL):
+    """Store benchmark prices (from get_stock_prices_yahoo) in benchmark_prices"""
+    print(f"\n📈 Loading benchmark {symbol}...")
+    if benchmark_df.empty:
+        print(f"   ⚠️ No benchmark prices, abnormal returns will be skipped")
+        return 0
+
+    benchmark_clean = benchmark_df.copy()
+    benchmark_clean['date'] = benchmark_clean['date'].astype(str)
+    benchmark_clean.to_sql(BENCHMARK_TABLE, conn, if_exists='replace', index=False)
+    conn.commit()
+    print(f"   ✅ Loaded {len(benchmark_clean):,} benchmark records")
+
+    return len(benchmark_clean)
+
+
+def read_benchmark(conn, symbol=BENCHMARK_SYMBOL):
+    """Benchmark (date, close) sorted by date, None if it was never loaded"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (BENCHMARK_TABLE,)
+    ).fetchone()
+    if row is None:
+        return None
+
+    benchmark = read_table(conn, BENCHMARK_TABLE, columns=['date', 'close'], symbols=[symbol], parse_dates=True)
+    if benchmark.empty:
+        return None
+
+    return benchmark.sort_values('date').reset_index(drop=True)
+
+
+def align_to_panel(panel, dates, values):
+    """
+    Values of a daily series (sorted dates) on each panel row's date
+    NaN where the series has no entry for that day; values may be 1-D or (days, k)
+    """
+    series_days = np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[D]')
+    values = np.asarray(values, dtype=np.float64)
+    days = panel['date'].astype('datetime64[D]')
+
+    out = np.full((len(days),) + values.shape[1:], np.nan)
+    if len(series_days) == 0:
+        return out
+
+    idx = np.clip(np.searchsorted(series_days, days), 0, len(series_days) - 1)
+    found = series_days[idx] == days
+    out[found] = values[idx[found]]
+    return out
+
+
+def market_returns(panel, benchmark):
+    """
+    Benchmark return (%) over the same interval as each panel row's daily return
+    (the symbol's previous trading day to this one); NaN where either close is missing
+    """
+    level = align_to_panel(panel, benchmark['date'], benchmark['close'])
+
+    returns = np.full(len(level), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = (level[1:] / level[:-1] - 1) * 100
+    returns[panel['offsets'][:-1][np.diff(panel['offsets']) > 0]] = np.nan
+    return returns
+
+
+def estimation_window(start, pre_start, est_days=ESTIMATION_WINDOW_DAYS, gap=ESTIMATION_GAP_DAYS):
+    """Return rows [lo, hi) of each event's estimation window, inside the symbol's history"""
+    hi = np.maximum(pre_start + 1 - gap, start)
+    lo = np.maximum(hi - est_days, start)
+    return lo, hi
+
+
+# ============================================================================
+# MARKET MODEL
+# ============================================================================
+
+def market_model(panel, market, start, pre_start, day0, post_end,
+                 est_days=ESTIMATION_WINDOW_DAYS, gap=ESTIMATION_GAP_DAYS, min_days=MIN_ESTIMATION_DAYS):
+    """
+    Alpha/beta per event and abnormal returns over its windows
+    start/pre_start/day0/post_end: panel rows per event, as in calculate_all_metrics
+    (return row i is the move from close[i - 1] to close[i]). Days without a
+    benchmark close are left out of both the estimation and the event windows.
+    CAR standard errors include the prediction error of alpha and beta.
+    Returns {column: array} for ABNORMAL_COLUMNS
+    """
+    stock = daily_returns(panel)
+    valid = ~np.isnan(stock) & ~np.isnan(market)
+    x = np.where(valid, market, 0.0)
+    y = np.where(valid, stock, 0.0)
+
+    # Prefix sums: any window sum is sums[k][hi] - sums[k][lo]
+    sums = {
+        k: np.concatenate([[0.0], np.cumsum(v)])
+        for k, v in {'n': valid.astype(np.float64), 'x': x, 'y': y,
+                     'xx': x * x, 'xy': x * y, 'yy': y * y}.items()
+    }
+
+    def window(k, lo, hi):
+        return sums[k][hi] - sums[k][lo]
+
+    est_lo, est_hi = estimation_window(start, pre_start, est_days, gap)
+
+    n = window('n', est_lo, est_hi)
+    sx, sy = window('x', est_lo, est_hi), window('y', est_lo, est_hi)
+    ok = n >= max(min_days, 3)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x = sx / n
+        sxx = window('xx', est_lo, est_hi) - sx * mean_x
+        sxy = window('xy', est_lo, est_hi) - sx * sy / n
+        syy = window('yy', est_lo, est_hi) - sy * sy / n
+        ok &= sxx > 0
+
+        beta = np.where(ok, sxy / sxx, np.nan)
+        alpha = np.where(ok, (sy - beta * sx) / n, np.nan)
+        sigma = np.sqrt(np.maximum(syy - beta * sxy, 0.0) / (n - 2))
+
+        def cumulative(lo, hi):
+            """CAR over return rows [lo, hi) and its standard error"""
+            k = window('n', lo, hi)
+            wx = window('x', lo, hi)
+            car = window('y', lo, hi) - k * alpha - beta * wx
+            se = sigma * np.sqrt(k + k * k / n + (wx - k * mean_x) ** 2 / sxx)
+            return np.where(k > 0, car, np.nan), np.where(k > 0, se, np.nan)
+
+        immediate, immediate_se = cumulative(day0 + 1, np.minimum(day0 + 2, post_end + 1))
+        has_next = post_end > day0
+        car_pre, _ = cumulative(pre_start + 1, day0)
+        car_post, car_post_se = cumulative(day0 + 1, post_end + 1)
+        car_total, _ = cumulative(pre_start + 1, post_end + 1)
+
+    return {
+        'alpha_pct': alpha,
+        'beta': beta,
+        'est_sigma_pct': np.where(ok, sigma, np.nan),
+        'est_days': n.astype(np.int64),
+        'abnormal_immediate_pct': np.where(has_next, immediate, np.nan),
+        'abnormal_immediate_se_pct': np.where(has_next, immediate_se, np.nan),
+        'car_pre_pct': car_pre,
+        'car_post_pct': car_post,
+        'car_post_se_pct': car_post_se,
+        'car_total_pct': car_total
+    }
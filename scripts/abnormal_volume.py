@@ -0,0 +1,72 @@
+# scripts/abnormal_volume.py
+"""
+Abnormal trading volume around earnings
+Each day's volume from -VOLUME_WINDOW_DAYS to +VOLUME_WINDOW_DAYS is divided by
+the symbol's average volume over the VOLUME_BASELINE_DAYS sessions before the
+event window. Baselines come from prefix sums over the flat volume array and
+the daily ratios from one (events x days) gather.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import config
+
+# Days on each side of day 0 with a volume ratio column
+VOLUME_WINDOW_DAYS = getattr(config, 'VOLUME_WINDOW_DAYS', 5)
+# Trailing sessions (ending before the event window) in the normal-volume baseline, e.g. 20 or 60
+VOLUME_BASELINE_DAYS = getattr(config, 'VOLUME_BASELINE_DAYS', 20)
+
+
+def day_label(day):
+    """Column suffix of a relative day: -5 -> 'm5', 0 -> '0', 3 -> 'p3'"""
+    return f'm{-day}' if day < 0 else (f'p{day}' if day > 0 else '0')
+
+
+def abnormal_volume(panel, start, end, day0, window=VOLUME_WINDOW_DAYS, baseline_days=VOLUME_BASELINE_DAYS):
+    """
+    Volume ratios around each event
+    start/end: row range of the event's symbol; day0: panel row of day 0.
+    Days past the end of the symbol's history, missing volumes and events
+    without a full baseline before the window are NaN.
+    Returns {column: array}:
+      baseline_volume          -> average daily volume of the baseline sessions
+      volume_ratio_<day>       -> volume on that day / baseline
+      abnormal_volume_pre_pct  -> average volume on days -window..-1 vs baseline (%)
+      abnormal_volume_post_pct -> average volume on days 0..+window vs baseline (%)
+    """
+    volume = panel['volume']
+    n_rows = len(volume)
+    valid = ~np.isnan(volume)
+
+    # Baseline: sessions [day0 - window - baseline_days, day0 - window)
+    total = np.concatenate([[0.0], np.cumsum(np.where(valid, volume, 0.0))])
+    count = np.concatenate([[0], np.cumsum(valid)])
+    hi = day0 - window
+    lo = hi - baseline_days
+    ok = lo >= start
+    lo, hi = np.clip(lo, 0, n_rows), np.clip(hi, 0, n_rows)
+    n = count[hi] - count[lo]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        baseline = np.where(ok & (n > 0), (total[hi] - total[lo]) / n, np.nan)
+        baseline[baseline <= 0] = np.nan
+
+    # (events, days) gather; rows outside the symbol's history are NaN
+    days = np.arange(-window, window + 1)
+    rows = day0[:, None] + days[None, :]
+    inside = (rows >= start[:, None]) & (rows < end[:, None])
+    window_volume = np.where(inside, volume[np.clip(rows, 0, max(n_rows - 1, 0))], np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = window_volume / baseline[:, None]
+        result = {'baseline_volume': baseline}
+        for i, day in enumerate(days):
+            result[f'volume_ratio_{day_label(day)}'] = ratios[:, i]
+        for name, side in (('pre', days < 0), ('post', days >= 0)):
+            part = ratios[:, side]
+            known = ~np.isnan(part)
+            result[f'abnormal_volume_{name}_pct'] = (np.where(known, part, 0.0).sum(axis=1) / known.sum(axis=1) - 1) * 100
+
+    return result
@@ -9,70 +9,249 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import sqlite3
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from config import DATABASE_PATH, PROCESSED_DATA_DIR
+from config import DATABASE_PATH, PROCESSED_DATA_DIR, PRE_EARNINGS_DAYS, POST_EARNINGS_DAYS
+from price_arrays import PRICE_TABLE_COLUMNS, has_price_blobs, read_price_blobs, frame_to_panel
+from table_store import read_table
+from group_stats import GroupStats, grouped_stats
+from bootstrap import BOOTSTRAP_CONFIDENCE, BOOTSTRAP_RESAMPLES, BOOTSTRAP_SEED
+from placebo import PLACEBO_TEST, PLACEBO_SAMPLES, PLACEBO_SEED, placebo_test
+from event_overlap import MACRO_CALENDAR_FILE, clean_events
+from olap_cube import EarningsCube
+from event_stats import standardize, test_value, event_study_tests
+from price_rollups import ROLLUP_TABLES
+from window_sweep import SWEEP_TABLE
+from backtest import RESULTS_TABLE as BACKTEST_TABLE, STRATEGIES
+from event_tensor import (
+    EVENT_TENSOR_DIR,
+    EVENTS_FILE,
+    RETURNS_FILE,
+    has_event_tensor,
+    load_event_tensor,
+    mean_returns_by,
+    car_curves
+)
+from fingerprint import Manifest, table_fingerprint, file_fingerprint, combine_fingerprints
+from charts import (
+    CHART_DPI,
+    CHART_FORMAT,
+    CHART_WORKERS,
+    render_charts,
+    plot_returns_distribution,
+    plot_company_performance,
+    plot_eps_impact,
+    plot_eps_vs_return,
+    plot_car_curves,
+    plot_reaction_heatmap
+)
+from duckdb_engine import ANALYSIS_ENGINE, connect_duckdb, query_arrow, run_analysis_queries
 
 # Set style
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
 
+REPORT_PATH = os.path.join(PROCESSED_DATA_DIR, 'analysis_summary.txt')
+VIZ_DIR = os.path.join(PROCESSED_DATA_DIR, 'visualizations')
+
+# Chart file name -> drawing function
+VISUALIZATIONS = {
+    '01_returns_distribution': plot_returns_distribution,
+    '02_company_performance': plot_company_performance,
+    '03_eps_impact': plot_eps_impact,
+    '04_eps_vs_return': plot_eps_vs_return
+}
+
+# Charts drawn from the event-time tensor, when it has been built
+TENSOR_VISUALIZATIONS = {
+    '05_car_by_eps': plot_car_curves,
+    '06_reaction_heatmap': plot_reaction_heatmap
+}
+
 
 def connect_db():
     """Connect to database"""
     return sqlite3.connect(DATABASE_PATH)
 
 
-def load_data():
+class Dataset:
+    """
+    Lazy handle on the analysis tables
+    A table (or column subset) is read the first time an analysis touches it
+    and memoized for the rest of the session
+    """
+    
+    def __init__(self, engine=ANALYSIS_ENGINE):
+        self.engine = engine
+        self._cache = {}
+        self._duck = None
+    
+    def table(self, name, columns=None):
+        """Return a table, optionally projected to some columns"""
+        key = (name, tuple(columns) if columns else None)
+        
+        if key not in self._cache:
+            full = self._cache.get((name, None))
+            if full is not None:
+                # Already loaded in full: project from memory
+                self._cache[key] = full[list(columns)]
+            else:
+                self._cache[key] = self._read(name, columns)
+        
+        return self._cache[key]
+    
+    def _read(self, name, columns):
+        """Read one table from the configured engine"""
+        print(f"   📂 Reading {name}{' (' + ', '.join(columns) + ')' if columns else ''}...")
+        
+        if self.engine == 'duckdb':
+            if self._duck is None:
+                self._duck = connect_duckdb()
+            select = ', '.join(f'"{c}"' for c in columns) if columns else '*'
+            return query_arrow(self._duck, f"SELECT {select} FROM {name}").to_pandas()
+        
+        conn = connect_db()
+        df = read_table(conn, name, columns)
+        conn.close()
+        return df
+    
+    def has_table(self, name):
+        """True if the table exists in the database (optional outputs such as the window sweep)"""
+        conn = connect_db()
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+        conn.close()
+        return row is not None
+    
+    def price_panel(self, symbols=None):
+        """Per-symbol price arrays (memoized)"""
+        key = ('price_panel', tuple(symbols) if symbols else None)
+        if key not in self._cache:
+            self._cache[key] = load_price_panel(symbols)
+        return self._cache[key]
+    
+    @property
+    def companies(self):
+        return self.table('companies')
+    
+    @property
+    def prices(self):
+        return self.table('stock_prices')
+    
+    @property
+    def earnings(self):
+        return self.table('earnings_dates')
+    
+    @property
+    def analysis(self):
+        return self.table('earnings_analysis')
+    
+    def event_tensor(self):
+        """(matrix, events, days) of the memory-mapped event-time returns, None if not built"""
+        if 'event_tensor' not in self._cache:
+            self._cache['event_tensor'] = load_event_tensor() if has_event_tensor() else None
+        return self._cache['event_tensor']
+    
+    def rollup(self, resolution='monthly'):
+        """OHLCV rollup of stock_prices: 'weekly', 'monthly' or 'quarterly'"""
+        return self.table(ROLLUP_TABLES[resolution])
+    
+    @property
+    def cube(self):
+        """OLAP cube over earnings_analysis for fast slicing (memoized)"""
+        if 'cube' not in self._cache:
+            self._cache['cube'] = EarningsCube.build(standardize(self.analysis))
+        return self._cache['cube']
+    
+    def close(self):
+        if self._duck is not None:
+            self._duck.close()
+            self._duck = None
+
+
+def load_data(engine=ANALYSIS_ENGINE):
     """Load all analysis data"""
+    data = Dataset(engine)
+    
+    companies = data.companies
+    prices = data.prices
+    earnings = data.earnings
+    analysis = data.analysis
+    
+    data.close()
+    
+    return companies, prices, earnings, analysis
+
+
+def load_price_panel(symbols=None):
+    """
+    Load prices as per-symbol arrays (see price_arrays.py)
+    Uses the blob store when present, so no per-row parsing
+    """
     conn = connect_db()
     
-    companies = pd.read_sql("SELECT * FROM companies", conn)
-    prices = pd.read_sql("SELECT * FROM stock_prices", conn)
-    earnings = pd.read_sql("SELECT * FROM earnings_dates", conn)
-    analysis = pd.read_sql("SELECT * FROM earnings_analysis", conn)
+    if has_price_blobs(conn):
+        panel = read_price_blobs(conn, symbols)
+    else:
+        panel = frame_to_panel(read_table(
+            conn, 'stock_prices', columns=PRICE_TABLE_COLUMNS, symbols=symbols, parse_dates=True
+        ))
     
     conn.close()
     
-    return companies, prices, earnings, analysis
+    return panel
 
 
-def print_summary_statistics(analysis):
+def print_summary_statistics(analysis, stats=None):
     """Print overall summary statistics"""
     print("\n" + "="*80)
     print("SUMMARY STATISTICS")
     print("="*80)
     
+    stats = stats or GroupStats(analysis)
+    overall = stats.overall()
+    
     print(f"\n📊 Overall Metrics:")
-    print(f"   Total companies analyzed: {analysis['symbol'].nunique()}")
+    print(f"   Total companies analyzed: {len(stats.by(['symbol']))}")
     print(f"   Total earnings events: {len(analysis)}")
-    print(f"   Average post-earnings return: {analysis['post_return_pct'].mean():.2f}%")
-    print(f"   Average immediate return: {analysis['immediate_return_pct']. mean():.2f}%")
-    print(f"   Win rate (positive returns): {(analysis['post_return_pct'] > 0).sum() / len(analysis) * 100:.1f}%")
-    print(f"   Best reaction: {analysis['post_return_pct'].max():.2f}%")
-    print(f"   Worst reaction: {analysis['post_return_pct'].min():.2f}%")
-    print(f"   Standard deviation: {analysis['post_return_pct'].std():.2f}%")
+    print(f"   Average post-earnings return: {overall['mean']:.2f}%")
+    print(f"   Average immediate return: {overall['immediate_return_pct_mean']:.2f}%")
+    print(f"   Win rate (positive returns): {overall['win_rate']:.1f}%")
+    print(f"   Best reaction: {overall['max']:.2f}%")
+    print(f"   Worst reaction: {overall['min']:.2f}%")
+    print(f"   Standard deviation: {overall['std']:.2f}%")
+
+
+def add_intervals(table, intervals):
+    """Append bootstrap CI columns (Return CI Low/High, Win Rate CI Low/High) to a report table"""
+    intervals = intervals.reindex(table.index)
+    table['Return CI Low'] = intervals['mean_lo'].round(2)
+    table['Return CI High'] = intervals['mean_hi'].round(2)
+    table['Win Rate CI Low'] = intervals['win_rate_lo'].round(1)
+    table['Win Rate CI High'] = intervals['win_rate_hi'].round(1)
+    return table
 
 
-def analyze_by_company(analysis):
+def analyze_by_company(analysis, stats=None):
     """Analyze performance by company"""
     print("\n" + "="*80)
     print("PERFORMANCE BY COMPANY")
     print("="*80)
     
-    company_stats = analysis.groupby('symbol').agg({
-        'post_return_pct': ['count', 'mean', 'std', 'min', 'max'],
-        'immediate_return_pct': 'mean',
-        'eps_surprise_pct': 'mean'
-    }).round(2)
+    stats = stats or GroupStats(analysis)
+    
+    company_stats = stats.by(['symbol'])[[
+        'count', 'mean', 'std', 'min', 'max', 'immediate_return_pct_mean', 'eps_surprise_pct_mean'
+    ]].round(2)
     
     company_stats.columns = ['Count', 'Avg Return', 'Std Dev', 'Min', 'Max', 'Avg Immediate', 'Avg EPS Surprise']
     
     # Add win rate
-    company_stats['Win Rate %'] = analysis. groupby('symbol').apply(
-        lambda x: (x['post_return_pct'] > 0).sum() / len(x) * 100
-    ).round(1)
+    company_stats['Win Rate %'] = stats.by(['symbol'])['win_rate'].round(1)
+    
+    # Bootstrap confidence intervals (small samples per company)
+    add_intervals(company_stats, stats.intervals(['symbol']))
     
     company_stats = company_stats.sort_values('Avg Return', ascending=False)
     
@@ -81,23 +260,22 @@ def analyze_by_company(analysis):
     return company_stats
 
 
-def analyze_eps_impact(analysis):
+def analyze_eps_impact(analysis, stats=None):
     """Analyze impact of EPS surprises"""
     print("\n" + "="*80)
     print("EPS SURPRISE IMPACT")
     print("="*80)
     
-    eps_stats = analysis[analysis['eps_category'] != 'Unknown'].groupby('eps_category').agg({
-        'post_return_pct': ['count', 'mean', 'std'],
-        'immediate_return_pct': 'mean'
-    }).round(2)
+    stats = stats or GroupStats(analysis)
+    by_category = stats.by(['eps_category']).drop(index='Unknown', errors='ignore')
+    
+    eps_stats = by_category[['count', 'mean', 'std', 'immediate_return_pct_mean']].round(2)
     
     eps_stats.columns = ['Count', 'Avg Return', 'Std Dev', 'Avg Immediate']
     
     # Add win rate
-    eps_stats['Win Rate %'] = analysis[analysis['eps_category'] != 'Unknown'].groupby('eps_category').apply(
-        lambda x: (x['post_return_pct'] > 0).sum() / len(x) * 100
-    ).round(1)
+    eps_stats['Win Rate %'] = by_category['win_rate'].round(1)
+    add_intervals(eps_stats, stats.intervals(['eps_category']))
     
     print("\n", eps_stats)
     
@@ -109,7 +287,217 @@ def analyze_eps_impact(analysis):
     return eps_stats
 
 
-def find_insights(analysis):
+def analyze_abnormal_returns(analysis, stats=None):
+    """Raw vs market-model and factor-model (CAR) post-earnings returns by EPS category"""
+    print("\n" + "="*80)
+    print("MARKET-ADJUSTED REACTIONS")
+    print("="*80)
+    
+    stats = stats or GroupStats(analysis)
+    raw = stats.by(['eps_category']).drop(index='Unknown', errors='ignore')
+    
+    adjusted = pd.DataFrame({
+        'Events': raw['count'],
+        'Avg Return': raw['mean'].round(2),
+        'Win Rate %': raw['win_rate'].round(1)
+    })
+    for col, label in (('car_post_pct', 'Market'), ('factor_car_post_pct', 'Factor')):
+        if col in analysis.columns:
+            car = stats.by(['eps_category'], col).drop(index='Unknown', errors='ignore')
+            adjusted[f'Avg {label} CAR'] = car['mean'].round(2)
+            adjusted[f'{label} CAR Win %'] = (car['wins'] / car['count'] * 100).round(1)
+    
+    print(f"\n📈 Post-earnings return vs cumulative abnormal return:")
+    print(adjusted.to_string())
+    if 'beta' in analysis.columns:
+        print(f"\n   Average beta: {analysis['beta'].mean():.2f} "
+              f"({analysis['beta'].notna().sum()} events with an estimation window)")
+    
+    return adjusted
+
+
+def analyze_abnormal_volume(analysis, stats=None):
+    """Volume around earnings relative to the trailing baseline, by EPS category"""
+    print("\n" + "="*80)
+    print("ABNORMAL VOLUME")
+    print("="*80)
+    
+    stats = stats or GroupStats(analysis)
+    ratio_cols = [c for c in analysis.columns if c.startswith('volume_ratio_')]
+    known = analysis[analysis['eps_category'] != 'Unknown']
+    
+    by_day = known.groupby('eps_category')[ratio_cols].mean()
+    by_day.loc['All'] = analysis[ratio_cols].mean()
+    by_day.columns = [c.replace('volume_ratio_', '').replace('m', '-').replace('p', '+') for c in ratio_cols]
+    print("\n📊 Average volume / baseline volume, columns = trading days relative to earnings:")
+    print(by_day.round(2).to_string())
+    
+    post = stats.by(['eps_category'], 'abnormal_volume_post_pct').drop(index='Unknown', errors='ignore')
+    print("\n📊 Abnormal volume from day 0 on (% above baseline):")
+    for category, row in post.iterrows():
+        print(f"   {category}: {row['mean']:+.1f}% ({row['wins'] / row['count'] * 100:.0f}% of events above normal)")
+    
+    return by_day
+
+
+def analyze_confounders(analysis):
+    """Overlapping earnings windows and macro events, and the reaction of clean events only"""
+    print("\n" + "="*80)
+    print("CONFOUNDED VS CLEAN EVENTS")
+    print("="*80)
+    
+    clean = clean_events(analysis)
+    print(f"\n🧹 Clean events: {len(clean)} of {len(analysis)} "
+          f"(no other company's earnings window or macro event inside the window)")
+    if 'n_overlapping_events' in analysis.columns:
+        print(f"   With overlapping earnings: {(analysis['n_overlapping_events'] > 0).sum()} "
+              f"(average {analysis['n_overlapping_events'].mean():.1f} overlapping windows)")
+        print(f"   With macro events: {(analysis['n_macro_events'] > 0).sum()}")
+    
+    samples = pd.concat([analysis.assign(sample='All events'), clean.assign(sample='Clean events')])
+    by_sample = grouped_stats(samples, ['sample'], quantiles=()).reindex(['All events', 'Clean events'])
+    comparison = pd.DataFrame({
+        'Events': by_sample['count'].fillna(0).astype(int),
+        'Avg Return': by_sample['mean'].round(2),
+        'Std Dev': by_sample['std'].round(2),
+        'Win Rate %': by_sample['win_rate'].round(1)
+    })
+    print(f"\n📊 Post-earnings return, all vs clean events:")
+    print(comparison.to_string())
+    
+    return comparison
+
+
+def analyze_significance(analysis, cube=None):
+    """Event-study significance (t, sign, Patell, BMP) by company, EPS category and quarter"""
+    print("\n" + "="*80)
+    print("STATISTICAL SIGNIFICANCE")
+    print("="*80)
+    
+    value = test_value(analysis.columns)
+    tests = event_study_tests(analysis, value=value, cube=cube)
+    
+    columns = ['events', 'mean', 't_stat', 't_p', 'pct_positive', 'sign_p', 'patell_z', 'bmp_t', 'bmp_p']
+    labels = {'symbol': 'company', 'eps_category': 'EPS result', 'year_quarter': 'quarter'}
+    
+    overall = tests['all'].iloc[0]
+    print(f"\n🧪 Testing {value} (two-sided p-values: Student t, exact sign test)")
+    print(f"   All events: mean {overall['mean']:.2f}%, t = {overall['t_stat']:.2f} (p = {overall['t_p']:.3f})")
+    
+    for name, table in tests.items():
+        if name == 'all':
+            continue
+        if name == 'year_quarter':
+            table = table.set_axis([f"{y}-Q{q}" for y, q in table.index], axis=0).rename_axis('year_quarter')
+        table = table[[c for c in columns if c in table.columns]]
+        print(f"\n📊 By {labels.get(name, name)}:")
+        print(table.round(3).to_string())
+        tests[name] = table
+    
+    return tests
+
+
+def analyze_placebo(analysis, panel, earnings):
+    """Compare the sell-the-news and win rates with placebo (non-earnings) dates"""
+    print("\n" + "="*80)
+    print("PLACEBO-DATE PERMUTATION TEST")
+    print("="*80)
+    
+    earnings = earnings[['symbol', 'date']].assign(date=pd.to_datetime(earnings['date'], errors='coerce'))
+    result = placebo_test(analysis, panel, earnings[earnings['date'].notna()])
+    
+    print(f"\n🎲 {result['windows']:,} placebo windows ({result['events']} events x "
+          f"{result['windows'] // max(result['events'], 1):,} random non-earnings dates)")
+    
+    labels = {'sell_news_rate': "'Sell the news' rate", 'win_rate': 'Win rate'}
+    for key, label in labels.items():
+        null = result['null'][key]
+        low, high = np.percentile(null, [2.5, 97.5])
+        print(f"\n   {label}: {result['observed'][key]:.1f}% on earnings vs "
+              f"{null.mean():.1f}% on placebo dates (95% range {low:.1f}% to {high:.1f}%)")
+        print(f"   Permutation p-value: {result['p_value'][key]:.3f}")
+    
+    return result
+
+
+def analyze_window_sensitivity(sweep):
+    """Average returns across the (pre, post) horizon grid of earnings_window_sweep"""
+    print("\n" + "="*80)
+    print("WINDOW SENSITIVITY")
+    print("="*80)
+    
+    by_post = grouped_stats(sweep.drop_duplicates(['symbol', 'earnings_date', 'post_days']), ['post_days'])
+    post_stats = by_post[['count', 'mean', 'std']].round(2)
+    post_stats.columns = ['Events', 'Avg Post Return', 'Std Dev']
+    post_stats['Win Rate %'] = by_post['win_rate'].round(1)
+    print("\n📐 Post-earnings return by horizon (days after):")
+    print(post_stats)
+    
+    by_window = grouped_stats(sweep, ['pre_days', 'post_days'], 'total_return_pct', quantiles=())
+    grid = by_window['mean'].unstack('post_days').round(2)
+    print("\n📐 Average total return (%), rows = days before, columns = days after:")
+    print(grid)
+    
+    return grid
+
+
+def analyze_backtests(results):
+    """Best parameter set of every strategy in backtest_results, before and after costs"""
+    print("\n" + "="*80)
+    print("STRATEGY BACKTESTS")
+    print("="*80)
+    
+    columns = ['entry_days', 'hold_days', 'trades', 'avg_trade_pct', 'win_rate',
+               'total_return_pct', 'sharpe', 'max_drawdown_pct']
+    ranked = results.dropna(subset=['sharpe']).sort_values('sharpe', ascending=False)
+    best = ranked.drop_duplicates(['strategy', 'cost_bps']).set_index(['strategy', 'cost_bps'])[columns]
+    best.columns = ['Entry', 'Hold', 'Trades', 'Avg Trade %', 'Win Rate %', 'Total Return %', 'Sharpe', 'Max DD %']
+    
+    for strategy in best.index.get_level_values('strategy').unique():
+        print(f"\n🧪 {strategy}: {STRATEGIES.get(strategy, '')}")
+        print(best.loc[strategy].round(2).to_string())
+    
+    return best
+
+
+def analyze_event_paths(tensor):
+    """Cumulative reaction paths by EPS category from the event-time tensor"""
+    matrix, events, days = tensor
+    
+    print("\n" + "="*80)
+    print(f"REACTION PATHS (DAY {days[0]} TO +{days[-1]})")
+    print("="*80)
+    
+    curves = car_curves(matrix, events, days, 'eps_category').drop(columns='Unknown', errors='ignore')
+    
+    checkpoints = [d for d in (days[0], -5, -1, 0, 1, 5, days[-1]) if d in curves.index]
+    print(f"\n📈 Cumulative average return (%) from day {days[0]}, by EPS result:")
+    print(curves.loc[sorted(set(checkpoints))].round(2))
+    
+    return curves
+
+
+def print_sql_analysis(engine=ANALYSIS_ENGINE):
+    """Run sql/03_analysis_queries.sql (needs the DuckDB engine for STDDEV)"""
+    if engine != 'duckdb':
+        return {}
+    
+    print("\n" + "="*80)
+    print("SQL ANALYSIS QUERIES (DUCKDB)")
+    print("="*80)
+    
+    duck = connect_duckdb()
+    results = run_analysis_queries(duck)
+    duck.close()
+    
+    for title, table in results.items():
+        print(f"\n🦆 {title}:")
+        print(table.to_pandas().round(2).to_string(index=False))
+    
+    return results
+
+
+def find_insights(analysis, stats=None):
     """Find interesting insights"""
     print("\n" + "="*80)
     print("KEY INSIGHTS")
@@ -128,7 +516,8 @@ def find_insights(analysis):
     print(f"   EPS: {worst['eps_category']}")
     
     # 3. Most consistent
-    volatility = analysis.groupby('symbol')['post_return_pct']. std().sort_values()
+    stats = stats or GroupStats(analysis)
+    volatility = stats.by(['symbol'])['std'].sort_values()
     print(f"\n🎯 Most Consistent (lowest volatility):")
     print(f"   {volatility.index[0]}: {volatility.iloc[0]:.2f}% std dev")
     
@@ -145,96 +534,86 @@ def find_insights(analysis):
             print(f"   - {row['symbol']} on {row['earnings_date']}: {row['post_return_pct']:.2f}%")
 
 
-def create_visualizations(analysis, company_stats):
-    """Create and save visualizations"""
+def create_visualizations(analysis, company_stats, dpi=CHART_DPI, fmt=CHART_FORMAT, workers=CHART_WORKERS,
+                          tensor=None):
+    """
+    Create and save visualizations
+    Charts are drawn in worker processes; charts whose inputs are unchanged are skipped
+    """
     print("\n" + "="*80)
     print("GENERATING VISUALIZATIONS")
     print("="*80)
     
-    viz_dir = os.path.join(PROCESSED_DATA_DIR, 'visualizations')
-    os.makedirs(viz_dir, exist_ok=True)
-    
-    # 1. Returns distribution
-    plt.figure(figsize=(12, 6))
-    plt.hist(analysis['post_return_pct'], bins=30, edgecolor='black', alpha=0.7)
-    plt.axvline(0, color='red', linestyle='--', label='Break-even')
-    plt.axvline(analysis['post_return_pct']. mean(), color='green', linestyle='--', label=f'Mean: {analysis["post_return_pct"].mean():.2f}%')
-    plt.xlabel('Post-Earnings Return (%)')
-    plt.ylabel('Frequency')
-    plt.title('Distribution of Post-Earnings Returns')
-    plt.legend()
-    plt.grid(alpha=0.3)
-    plt.savefig(os.path.join(viz_dir, '01_returns_distribution.png'), dpi=300, bbox_inches='tight')
-    print(f"   ✅ Saved:  01_returns_distribution.png")
-    plt.close()
-    
-    # 2. Company performance
-    plt.figure(figsize=(12, 6))
-    company_stats['Avg Return'].sort_values().plot(kind='barh', color='steelblue')
-    plt.axvline(0, color='red', linestyle='--', alpha=0.5)
-    plt.xlabel('Average Post-Earnings Return (%)')
-    plt.title('Average Post-Earnings Return by Company')
-    plt.grid(alpha=0.3, axis='x')
-    plt.tight_layout()
-    plt.savefig(os.path.join(viz_dir, '02_company_performance.png'), dpi=300, bbox_inches='tight')
-    print(f"   ✅ Saved: 02_company_performance.png")
-    plt.close()
-    
-    # 3. EPS Impact
-    eps_data = analysis[analysis['eps_category'] != 'Unknown']. groupby('eps_category')['post_return_pct']. mean().sort_values()
-    plt.figure(figsize=(10, 6))
-    eps_data.plot(kind='bar', color=['red', 'gray', 'green'])
-    plt.axhline(0, color='black', linestyle='--', alpha=0.5)
-    plt.xlabel('EPS Category')
-    plt.ylabel('Average Post-Earnings Return (%)')
-    plt.title('Stock Performance by EPS Result')
-    plt.xticks(rotation=0)
-    plt.grid(alpha=0.3, axis='y')
-    plt.tight_layout()
-    plt.savefig(os.path. join(viz_dir, '03_eps_impact.png'), dpi=300, bbox_inches='tight')
-    print(f"   ✅ Saved:  03_eps_impact.png")
-    plt.close()
-    
-    # 4. Scatter:  EPS Surprise vs Stock Return
-    filtered = analysis[analysis['eps_surprise_pct']. notna()]
-    plt.figure(figsize=(12, 6))
-    for symbol in filtered['symbol'].unique():
-        data = filtered[filtered['symbol'] == symbol]
-        plt.scatter(data['eps_surprise_pct'], data['post_return_pct'], label=symbol, alpha=0.6, s=100)
-    plt.axhline(0, color='gray', linestyle='--', alpha=0.5)
-    plt.axvline(0, color='gray', linestyle='--', alpha=0.5)
-    plt.xlabel('EPS Surprise (%)')
-    plt.ylabel('Post-Earnings Return (%)')
-    plt.title('EPS Surprise vs Stock Performance')
-    plt.legend()
-    plt.grid(alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(os.path.join(viz_dir, '04_eps_vs_return.png'), dpi=300, bbox_inches='tight')
-    print(f"   ✅ Saved: 04_eps_vs_return.png")
-    plt.close()
-    
-    print(f"\n📁 Visualizations saved to: {viz_dir}")
-
-
-def export_summary_report(analysis, company_stats, eps_stats):
+    eps_data = analysis[analysis['eps_category'] != 'Unknown'].groupby('eps_category')['post_return_pct'].mean()
+    filtered = analysis[analysis['eps_surprise_pct'].notna()]
+    
+    chart_data = {
+        '01_returns_distribution': {
+            'returns': analysis['post_return_pct'].to_numpy(dtype=float)
+        },
+        '02_company_performance': {
+            'symbols': company_stats.index.to_numpy(dtype=str),
+            'avg_returns': company_stats['Avg Return'].to_numpy(dtype=float)
+        },
+        '03_eps_impact': {
+            'categories': eps_data.index.to_numpy(dtype=str),
+            'avg_returns': eps_data.to_numpy(dtype=float)
+        },
+        '04_eps_vs_return': {
+            'surprise': filtered['eps_surprise_pct'].to_numpy(dtype=float),
+            'returns': filtered['post_return_pct'].to_numpy(dtype=float),
+            'symbols': filtered['symbol'].to_numpy(dtype=str)
+        }
+    }
+    charts = [(name, func, chart_data[name]) for name, func in VISUALIZATIONS.items()]
+    
+    # Reaction paths from the event-time tensor, when it has been built
+    if tensor is not None:
+        matrix, events, days = tensor
+        curves = car_curves(matrix, events, days, 'eps_category').drop(columns='Unknown', errors='ignore')
+        by_symbol = mean_returns_by(matrix, events, days, 'symbol')
+        charts += [
+            ('05_car_by_eps', TENSOR_VISUALIZATIONS['05_car_by_eps'], {
+                'days': days,
+                'curves': curves.T.to_numpy(),
+                'labels': curves.columns.to_numpy(dtype=str)
+            }),
+            ('06_reaction_heatmap', TENSOR_VISUALIZATIONS['06_reaction_heatmap'], {
+                'days': days,
+                'values': by_symbol.to_numpy(),
+                'labels': by_symbol.index.to_numpy(dtype=str)
+            })
+        ]
+    
+    render_charts(charts, VIZ_DIR, dpi=dpi, fmt=fmt, workers=workers)
+    
+    print(f"\n📁 Visualizations saved to: {VIZ_DIR}")
+
+
+def export_summary_report(analysis, company_stats, eps_stats, stats=None):
     """Export summary report"""
     print("\n" + "="*80)
     print("EXPORTING SUMMARY REPORT")
     print("="*80)
     
-    report_path = os.path.join(PROCESSED_DATA_DIR, 'analysis_summary.txt')
+    stats = stats or GroupStats(analysis)
+    overall = stats.overall()
+    ci = stats.intervals().iloc[0]
+    confidence = BOOTSTRAP_CONFIDENCE
     
-    with open(report_path, 'w') as f:
+    with open(REPORT_PATH, 'w') as f:
         f.write("="*80 + "\n")
         f.write("EARNINGS STOCK ANALYSIS - SUMMARY REPORT\n")
         f.write("="*80 + "\n\n")
         
         f.write("OVERALL STATISTICS\n")
         f.write("-"*80 + "\n")
-        f.write(f"Total companies:  {analysis['symbol'].nunique()}\n")
+        f.write(f"Total companies:  {len(stats.by(['symbol']))}\n")
         f.write(f"Total earnings events: {len(analysis)}\n")
-        f.write(f"Average return: {analysis['post_return_pct'].mean():.2f}%\n")
-        f.write(f"Win rate:  {(analysis['post_return_pct'] > 0).sum() / len(analysis) * 100:.1f}%\n\n")
+        f.write(f"Average return: {overall['mean']:.2f}%"
+                f" ({confidence:.0%} CI {ci['mean_lo']:.2f}% to {ci['mean_hi']:.2f}%)\n")
+        f.write(f"Win rate:  {overall['win_rate']:.1f}%"
+                f" ({confidence:.0%} CI {ci['win_rate_lo']:.1f}% to {ci['win_rate_hi']:.1f}%)\n\n")
         
         f. write("COMPANY PERFORMANCE\n")
         f.write("-"*80 + "\n")
@@ -245,32 +624,94 @@ def export_summary_report(analysis, company_stats, eps_stats):
         f.write("-"*80 + "\n")
         f.write(eps_stats.to_string())
         f.write("\n\n")
+        
+        f.write(f"CI columns: {confidence:.0%} percentile bootstrap, {BOOTSTRAP_RESAMPLES:,} resamples\n")
+    
+    print(f"   ✅ Report saved to: {REPORT_PATH}")
+
+
+def analysis_fingerprint():
+    """Fingerprint of everything the report and charts are built from (tables, files and settings)"""
+    conn = connect_db()
+    tables = ['earnings_analysis', SWEEP_TABLE, BACKTEST_TABLE]
+    if PLACEBO_TEST:
+        tables += ['stock_prices', 'earnings_dates']
+    fingerprints = [table_fingerprint(conn, table) for table in tables]
+    conn.close()
     
-    print(f"   ✅ Report saved to: {report_path}")
+    files = [os.path.join(EVENT_TENSOR_DIR, RETURNS_FILE), os.path.join(EVENT_TENSOR_DIR, EVENTS_FILE),
+             MACRO_CALENDAR_FILE]
+    settings = [
+        CHART_DPI, CHART_FORMAT,
+        BOOTSTRAP_RESAMPLES, BOOTSTRAP_CONFIDENCE, BOOTSTRAP_SEED,
+        PLACEBO_TEST, PLACEBO_SAMPLES, PLACEBO_SEED, PRE_EARNINGS_DAYS, POST_EARNINGS_DAYS
+    ]
+    return combine_fingerprints(*fingerprints, *[file_fingerprint(f) for f in files], *settings)
 
 
-def main():
-    """Main analysis execution"""
+def analysis_artifacts(fmt=CHART_FORMAT):
+    """Files written by a full analysis run"""
+    charts = list(VISUALIZATIONS) + (list(TENSOR_VISUALIZATIONS) if has_event_tensor() else [])
+    return [REPORT_PATH] + [os.path.join(VIZ_DIR, f'{name}.{fmt}') for name in charts]
+
+
+def main(force=False):
+    """
+    Main analysis execution
+    Skipped when earnings_analysis is unchanged since the last run (unless force=True)
+    """
     print("\n" + "="*80)
     print("DAY 3: DATA ANALYSIS & INSIGHTS")
     print("="*80)
     
-    # Load data
+    manifest = Manifest()
+    fingerprint = analysis_fingerprint()
+    artifacts = analysis_artifacts()
+    
+    if not force and manifest.all_fresh(artifacts, fingerprint):
+        print("\n⏭️ earnings_analysis unchanged since the last run - report and charts are up to date")
+        print(f"📁 {REPORT_PATH}")
+        return
+    
+    # Load data (tables are read lazily, only when an analysis needs them)
     print("\n📂 Loading data from database...")
-    companies, prices, earnings, analysis = load_data()
+    data = Dataset()
+    analysis = data.analysis
     print(f"   ✅ Loaded:  {len(analysis)} analyzed earnings events")
     
-    # Run analyses
-    print_summary_statistics(analysis)
-    company_stats = analyze_by_company(analysis)
-    eps_stats = analyze_eps_impact(analysis)
-    find_insights(analysis)
+    # Run analyses (grouped statistics computed once and shared)
+    stats = GroupStats(analysis)
+    print_summary_statistics(analysis, stats)
+    company_stats = analyze_by_company(analysis, stats)
+    eps_stats = analyze_eps_impact(analysis, stats)
+    find_insights(analysis, stats)
+    if {'car_post_pct', 'factor_car_post_pct'} & set(analysis.columns):
+        analyze_abnormal_returns(analysis, stats)
+    if 'abnormal_volume_post_pct' in analysis.columns:
+        analyze_abnormal_volume(analysis, stats)
+    analyze_confounders(analysis)
+    analyze_significance(analysis, data.cube)
+    if PLACEBO_TEST:
+        analyze_placebo(analysis, data.price_panel(), data.earnings)
+    if data.has_table(SWEEP_TABLE):
+        analyze_window_sensitivity(data.table(SWEEP_TABLE))
+    if data.has_table(BACKTEST_TABLE):
+        analyze_backtests(data.table(BACKTEST_TABLE))
+    if data.event_tensor() is not None:
+        analyze_event_paths(data.event_tensor())
+    print_sql_analysis()
     
     # Create visualizations
-    create_visualizations(analysis, company_stats)
+    create_visualizations(analysis, company_stats, tensor=data.event_tensor())
     
     # Export report
-    export_summary_report(analysis, company_stats, eps_stats)
+    export_summary_report(analysis, company_stats, eps_stats, stats)
+    
+    data.close()
+    
+    for artifact in artifacts:
+        manifest.record(artifact, fingerprint)
+    manifest.save()
     
     print("\n" + "="*80)
     print("✅ DAY 3 ANALYSIS COMPLETE!")
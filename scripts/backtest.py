@@ -0,0 +1,235 @@
+# scripts/backtest.py
+"""
+Vectorized earnings-strategy backtester
+A strategy turns every earnings event into a position schedule (side, entry
+row, exit row) on the flat price panel. Trade returns are one gather from the
+close array; the daily equity curve comes from difference arrays over the
+panel rows (positions open at entry, close at exit) summed per date.
+Parameter grids are evaluated in parallel, one combination per task.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+import config
+from price_arrays import locate_events, load_price_panel
+from event_tensor import daily_returns
+from table_store import read_table, save_table
+
+# Run the backtest grid in the pipeline after calculate_all_metrics
+BACKTEST = getattr(config, 'BACKTEST', False)
+BACKTEST_STRATEGIES = getattr(config, 'BACKTEST_STRATEGIES', ('pre_drift', 'post_beat', 'short_sell_news'))
+BACKTEST_ENTRY_DAYS = getattr(config, 'BACKTEST_ENTRY_DAYS', (1, 3, 5, 10))
+BACKTEST_HOLD_DAYS = getattr(config, 'BACKTEST_HOLD_DAYS', (1, 3, 5, 10))
+# Transaction cost per side, in basis points
+BACKTEST_COST_BPS = getattr(config, 'BACKTEST_COST_BPS', (0, 10))
+BACKTEST_WORKERS = getattr(config, 'BACKTEST_WORKERS', None)
+
+RESULTS_TABLE = 'backtest_results'
+EQUITY_TABLE = 'backtest_equity'
+TRADING_DAYS = 252
+
+# Strategy -> what entry_days / hold_days mean
+STRATEGIES = {
+    'pre_drift': "long entry_days closes before day 0, exit hold_days closes after the last pre-earnings close",
+    'post_beat': "long after an EPS beat, entry entry_days closes after day 0, held hold_days closes",
+    'short_sell_news': "short at the last pre-earnings close if the stock rose over the previous entry_days, held hold_days closes"
+}
+
+
+# ============================================================================
+# POSITION SCHEDULES
+# ============================================================================
+
+def strategy_schedule(strategy, close, events, entry_days, hold_days):
+    """
+    Position schedule per event for one parameter set
+    events: dict of arrays (day0, start, end, beat)
+    Returns (side, entry row, exit row); side is +1 long, -1 short, 0 no trade
+    """
+    day0 = events['day0']
+    last_pre = day0 - 1
+
+    if strategy == 'pre_drift':
+        side = np.ones(len(day0), dtype=np.int64)
+        entry = last_pre - entry_days
+        exit_ = last_pre + hold_days
+    elif strategy == 'post_beat':
+        side = events['beat'].astype(np.int64)
+        entry = day0 + entry_days
+        exit_ = entry + hold_days
+    elif strategy == 'short_sell_news':
+        lookback = last_pre - entry_days
+        with np.errstate(invalid='ignore'):
+            ran_up = close[np.clip(last_pre, 0, len(close) - 1)] > close[np.clip(lookback, 0, len(close) - 1)]
+        side = -(ran_up & (lookback >= events['start'])).astype(np.int64)
+        entry = last_pre
+        exit_ = last_pre + hold_days
+    else:
+        raise ValueError(f"Unknown strategy: {strategy}")
+
+    # Only trades whose whole holding period is inside the symbol's history
+    fits = (entry >= events['start']) & (exit_ < events['end']) & (exit_ > entry)
+    side = np.where(fits, side, 0)
+    return side, np.where(fits, entry, 0), np.where(fits, exit_, 0)
+
+
+# ============================================================================
+# SIMULATION
+# ============================================================================
+
+def simulate(panel, returns, date_codes, n_dates, events, strategy, entry_days, hold_days, cost_bps):
+    """
+    Trades and daily equity of one parameter set
+    Capital is split equally across open positions each day; the round-trip
+    cost of a trade is charged on its exit day.
+    Returns (trade returns in %, daily portfolio returns)
+    """
+    close = panel['close']
+    side, entry, exit_ = strategy_schedule(strategy, close, events, entry_days, hold_days)
+    trade = side != 0
+    side, entry, exit_ = side[trade], entry[trade], exit_[trade]
+
+    cost = 2 * cost_bps / 10000
+    with np.errstate(divide='ignore', invalid='ignore'):
+        trade_returns = (side * (close[exit_] / close[entry] - 1) - cost) * 100
+
+    # Open positions per panel row: return rows entry+1 .. exit (difference arrays)
+    n = len(close)
+    position = np.zeros(n + 1)
+    active = np.zeros(n + 1)
+    np.add.at(position, entry + 1, side)
+    np.add.at(position, exit_ + 1, -side)
+    np.add.at(active, entry + 1, 1)
+    np.add.at(active, exit_ + 1, -1)
+    position = np.cumsum(position[:-1])
+    active = np.cumsum(active[:-1])
+
+    held = active > 0
+    pnl = np.bincount(date_codes[held], weights=position[held] * np.nan_to_num(returns[held]) / 100, minlength=n_dates)
+    open_count = np.bincount(date_codes[held], weights=active[held], minlength=n_dates)
+    costs = np.bincount(date_codes[exit_], weights=np.full(len(exit_), cost), minlength=n_dates)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily = np.where(open_count > 0, (pnl - costs) / open_count, 0.0)
+
+    return trade_returns, daily
+
+
+def summarize(trade_returns, daily):
+    """Performance statistics of one simulation"""
+    equity = np.cumprod(1 + daily)
+    peak = np.maximum.accumulate(equity) if len(equity) else equity
+    std = daily.std(ddof=1) if len(daily) > 1 else np.nan
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'trades': len(trade_returns),
+            'avg_trade_pct': trade_returns.mean() if len(trade_returns) else np.nan,
+            'win_rate': (trade_returns > 0).mean() * 100 if len(trade_returns) else np.nan,
+            'total_return_pct': (equity[-1] - 1) * 100 if len(equity) else np.nan,
+            'sharpe': daily.mean() / std * np.sqrt(TRADING_DAYS) if std > 0 else np.nan,
+            'max_drawdown_pct': ((equity / peak - 1).min() * 100) if len(equity) else np.nan
+        }
+
+
+# ============================================================================
+# PARAMETER GRID
+# ============================================================================
+
+_CONTEXT = {}
+
+
+def _init_worker(context):
+    _CONTEXT.update(context)
+
+
+def run_combination(params):
+    """Backtest one (strategy, entry_days, hold_days, cost_bps) set with the shared context"""
+    trades, daily = simulate(
+        _CONTEXT['panel'], _CONTEXT['returns'], _CONTEXT['date_codes'], _CONTEXT['n_dates'],
+        _CONTEXT['events'], *params
+    )
+    return dict(zip(['strategy', 'entry_days', 'hold_days', 'cost_bps'], params), **summarize(trades, daily))
+
+
+def backtest_context(panel, analysis):
+    """Arrays shared by every parameter set"""
+    loc = locate_events(panel, analysis['symbol'], pd.to_datetime(analysis['earnings_date']))
+    days = panel['date'].astype('datetime64[D]')
+    dates, date_codes = np.unique(days, return_inverse=True)
+
+    return {
+        'panel': panel,
+        'returns': daily_returns(panel),
+        'dates': dates,
+        'date_codes': date_codes,
+        'n_dates': len(dates),
+        'events': {
+            'day0': loc['pos'],
+            'start': loc['start'],
+            'end': loc['end'],
+            'beat': (analysis['eps_category'] == 'Beat').to_numpy()
+        }
+    }
+
+
+def run_grid(context, strategies=BACKTEST_STRATEGIES, entry_grid=BACKTEST_ENTRY_DAYS,
+             hold_grid=BACKTEST_HOLD_DAYS, cost_grid=BACKTEST_COST_BPS, workers=BACKTEST_WORKERS):
+    """Evaluate every parameter combination, in parallel when workers > 1"""
+    combos = list(itertools.product(strategies, entry_grid, hold_grid, cost_grid))
+
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(context,)) as pool:
+            rows = list(pool.map(run_combination, combos, chunksize=max(1, len(combos) // (workers * 4))))
+    else:
+        _init_worker(context)
+        rows = [run_combination(combo) for combo in combos]
+
+    return pd.DataFrame(rows)
+
+
+def run_backtests(conn, workers=BACKTEST_WORKERS):
+    """Run the grid on earnings_analysis and save results and best equity curves"""
+    print("\n" + "="*80)
+    print("STRATEGY BACKTESTS")
+    print("="*80)
+
+    panel = load_price_panel(conn)
+    analysis = read_table(conn, 'earnings_analysis', columns=['symbol', 'earnings_date', 'eps_category'])
+    context = backtest_context(panel, analysis)
+
+    results = run_grid(context, workers=workers)
+    print(f"\n🧪 {len(results)} parameter sets x {len(analysis)} events")
+    for strategy in BACKTEST_STRATEGIES:
+        print(f"   • {strategy}: {STRATEGIES[strategy]}")
+    print()
+
+    # Equity curve of the best set (by Sharpe) of every strategy
+    # (strategies without any trades have no Sharpe ratio and no curve)
+    ranked = results.dropna(subset=['sharpe']).sort_values('sharpe', ascending=False, kind='stable')
+    best = ranked.drop_duplicates('strategy')
+    curves = []
+    for _, row in best.iterrows():
+        _, daily = simulate(context['panel'], context['returns'], context['date_codes'], context['n_dates'],
+                            context['events'], row['strategy'], row['entry_days'], row['hold_days'], row['cost_bps'])
+        curves.append(pd.DataFrame({
+            'strategy': row['strategy'],
+            'date': context['dates'].astype(str),
+            'daily_return_pct': daily * 100,
+            'equity': np.cumprod(1 + daily)
+        }))
+        print(f"   {row['strategy']}: entry {row['entry_days']}, hold {row['hold_days']}, "
+              f"cost {row['cost_bps']} bps -> {row['total_return_pct']:.1f}% total, Sharpe {row['sharpe']:.2f}")
+
+    save_table(results, RESULTS_TABLE, conn)
+    if curves:
+        save_table(pd.concat(curves, ignore_index=True), EQUITY_TABLE, conn)
+    print(f"✅ Saved to {RESULTS_TABLE} and {EQUITY_TABLE}")
+
+    return results
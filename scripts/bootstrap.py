@@ -0,0 +1,117 @@
+# scripts/bootstrap.py
+"""
+Vectorized bootstrap confidence intervals
+All groups are resampled together: one (resamples x events) index matrix
+draws, in every column, a random event of that column's group. Means and win
+rates of every group in every resample come from np.add.reduceat along the
+rows, and percentile intervals from one np.percentile call.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+import config
+from group_stats import DEFAULT_VALUE, group_codes
+
+BOOTSTRAP_RESAMPLES = getattr(config, 'BOOTSTRAP_RESAMPLES', 10000)
+BOOTSTRAP_CONFIDENCE = getattr(config, 'BOOTSTRAP_CONFIDENCE', 0.95)
+BOOTSTRAP_SEED = getattr(config, 'BOOTSTRAP_SEED', 42)
+# Worker processes for large resample counts (None or 1 = in process)
+BOOTSTRAP_WORKERS = getattr(config, 'BOOTSTRAP_WORKERS', None)
+
+# Size of one index matrix chunk; chunking depends only on the data, so
+# results for a given seed are the same with any number of workers
+MAX_CHUNK_ELEMENTS = 8_000_000
+
+
+# ============================================================================
+# RESAMPLING
+# ============================================================================
+
+def resample_chunk(values, starts, sizes, n_resamples, seed):
+    """
+    Means and win rates of n_resamples resamples of every group
+    values: sorted by group; starts/sizes: each group's row range (sizes > 0)
+    Returns (means, win_rates), each (n_resamples, n_groups)
+    """
+    rng = np.random.default_rng(seed)
+
+    # Column j always draws from its own group's rows
+    lo = np.repeat(starts, sizes)
+    idx = lo + rng.integers(0, np.repeat(sizes, sizes), size=(n_resamples, len(values)))
+    sample = values[idx]
+
+    sums = np.add.reduceat(sample, starts, axis=1)
+    wins = np.add.reduceat((sample > 0).astype(np.int64), starts, axis=1)
+
+    return sums / sizes, wins / sizes * 100
+
+
+def run_chunks(func, data, n_draws, row_elements, seed, workers):
+    """
+    Call func(*data, n, seed) over chunks of n_draws draws and concatenate its outputs
+    Each chunk gets an independent SeedSequence stream; chunk sizes depend only
+    on row_elements (elements per draw), optionally run over a process pool
+    """
+    chunk = int(np.clip(MAX_CHUNK_ELEMENTS // max(row_elements, 1), 1, max(n_draws, 1)))
+    counts = [chunk] * (n_draws // chunk) + ([n_draws % chunk] if n_draws % chunk else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+
+    args = [tuple(data) + (n, s) for n, s in zip(counts, seeds)]
+    if workers and workers > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(func, *zip(*args)))
+    else:
+        parts = [func(*a) for a in args]
+
+    return tuple(np.concatenate(outputs) for outputs in zip(*parts))
+
+
+# ============================================================================
+# CONFIDENCE INTERVALS
+# ============================================================================
+
+def bootstrap_stats(df, keys=(), value=DEFAULT_VALUE, n_resamples=BOOTSTRAP_RESAMPLES,
+                    confidence=BOOTSTRAP_CONFIDENCE, seed=BOOTSTRAP_SEED, workers=BOOTSTRAP_WORKERS):
+    """
+    Percentile bootstrap intervals of the mean and win rate of `value` per group
+    Rows with a missing value are left out. Columns: count, mean, mean_lo,
+    mean_hi, win_rate, win_rate_lo, win_rate_hi (empty keys = one overall row)
+    """
+    codes, index = group_codes(df, keys)
+    values = df[value].to_numpy(dtype=np.float64)
+    keep = (codes >= 0) & ~np.isnan(values)
+
+    order = np.argsort(codes[keep], kind='stable')
+    values = values[keep][order]
+    n_groups = len(index)
+
+    all_sizes = np.bincount(codes[keep], minlength=n_groups)
+    has_data = all_sizes > 0
+    starts = np.concatenate([[0], np.cumsum(all_sizes)[:-1]])[has_data].astype(np.int64)
+    sizes = all_sizes[has_data]
+
+    result = pd.DataFrame({'count': all_sizes}, index=index)
+    columns = ['mean', 'mean_lo', 'mean_hi', 'win_rate', 'win_rate_lo', 'win_rate_hi']
+    for col in columns:
+        result[col] = np.nan
+
+    if len(sizes) == 0 or n_resamples < 1:
+        return result
+
+    means, win_rates = run_chunks(resample_chunk, (values, starts, sizes), n_resamples, len(values), seed, workers)
+
+    tail = (1 - confidence) / 2 * 100
+    mean_lo, mean_hi = np.percentile(means, [tail, 100 - tail], axis=0)
+    win_lo, win_hi = np.percentile(win_rates, [tail, 100 - tail], axis=0)
+
+    result.loc[has_data, columns] = np.column_stack([
+        np.add.reduceat(values, starts) / sizes, mean_lo, mean_hi,
+        np.add.reduceat((values > 0).astype(np.int64), starts) / sizes * 100, win_lo, win_hi
+    ])
+
+    return result
@@ -0,0 +1,243 @@
+# scripts/charts.py
+"""
+Chart rendering
+Each chart is a plain function of arrays, drawn on the headless Agg backend
+in a worker process. A chart is skipped when the hash of its inputs matches
+the sidecar written next to the existing file.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hashlib
+import types
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.lines import Line2D
+import seaborn as sns
+import config
+
+CHART_DPI = getattr(config, 'CHART_DPI', 300)
+CHART_FORMAT = getattr(config, 'CHART_FORMAT', 'png')
+# Worker processes (None = one per CPU, 1 = render in this process)
+CHART_WORKERS = getattr(config, 'CHART_WORKERS', None)
+
+# Symbols beyond this are still colored but left out of the legend
+MAX_LEGEND_ENTRIES = 20
+
+# Applied on import so worker processes draw with the same style
+sns.set_style("whitegrid")
+
+
+# ============================================================================
+# CHARTS
+# ============================================================================
+
+def plot_returns_distribution(path, dpi, returns):
+    """Histogram of post-earnings returns"""
+    mean = np.nanmean(returns)
+    plt.figure(figsize=(12, 6))
+    plt.hist(returns, bins=30, edgecolor='black', alpha=0.7)
+    plt.axvline(0, color='red', linestyle='--', label='Break-even')
+    plt.axvline(mean, color='green', linestyle='--', label=f'Mean: {mean:.2f}%')
+    plt.xlabel('Post-Earnings Return (%)')
+    plt.ylabel('Frequency')
+    plt.title('Distribution of Post-Earnings Returns')
+    plt.legend()
+    plt.grid(alpha=0.3)
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def plot_company_performance(path, dpi, symbols, avg_returns):
+    """Horizontal bars of average post-earnings return per company (sorted)"""
+    order = np.argsort(avg_returns, kind='stable')
+    plt.figure(figsize=(12, 6))
+    plt.barh(np.asarray(symbols)[order], np.asarray(avg_returns)[order], height=0.5, color='steelblue')
+    plt.axvline(0, color='red', linestyle='--', alpha=0.5)
+    plt.xlabel('Average Post-Earnings Return (%)')
+    plt.ylabel('symbol')
+    plt.title('Average Post-Earnings Return by Company')
+    plt.grid(alpha=0.3, axis='x')
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def plot_eps_impact(path, dpi, categories, avg_returns):
+    """Bars of average post-earnings return per EPS category (sorted)"""
+    order = np.argsort(avg_returns, kind='stable')
+    plt.figure(figsize=(10, 6))
+    plt.bar(np.asarray(categories)[order], np.asarray(avg_returns)[order], width=0.5, color=['red', 'gray', 'green'])
+    plt.axhline(0, color='black', linestyle='--', alpha=0.5)
+    plt.xlabel('EPS Category')
+    plt.ylabel('Average Post-Earnings Return (%)')
+    plt.title('Stock Performance by EPS Result')
+    plt.xticks(rotation=0)
+    plt.grid(alpha=0.3, axis='y')
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def symbol_colors(codes, n_symbols):
+    """RGBA color per point from categorical symbol codes"""
+    if n_symbols <= 10:
+        palette = np.asarray(matplotlib.colormaps['tab10'].colors)
+    elif n_symbols <= 20:
+        palette = np.asarray(matplotlib.colormaps['tab20'].colors)
+    else:
+        palette = matplotlib.colormaps['turbo'](np.linspace(0, 1, n_symbols))[:, :3]
+    return palette[codes], palette
+
+
+def plot_eps_vs_return(path, dpi, surprise, returns, symbols):
+    """EPS surprise vs post-earnings return, one scatter call colored by symbol"""
+    # First-appearance order keeps the colors of the per-symbol loop this replaces
+    codes, labels = pd.factorize(np.asarray(symbols))
+    colors, palette = symbol_colors(codes, len(labels))
+
+    plt.figure(figsize=(12, 6))
+    plt.scatter(surprise, returns, c=colors, alpha=0.6, s=100)
+    plt.axhline(0, color='gray', linestyle='--', alpha=0.5)
+    plt.axvline(0, color='gray', linestyle='--', alpha=0.5)
+    plt.xlabel('EPS Surprise (%)')
+    plt.ylabel('Post-Earnings Return (%)')
+    plt.title('EPS Surprise vs Stock Performance')
+    if 0 < len(labels) <= MAX_LEGEND_ENTRIES:
+        plt.legend(handles=[
+            Line2D([], [], marker='o', linestyle='', alpha=0.6, markersize=10,
+                   color=palette[k], label=label)
+            for k, label in enumerate(labels)
+        ])
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def plot_car_curves(path, dpi, days, curves, labels):
+    """Cumulative average return paths around earnings, one line per group"""
+    plt.figure(figsize=(12, 6))
+    for label, curve in zip(labels, np.asarray(curves)):
+        plt.plot(days, curve, linewidth=2, label=label)
+    plt.axhline(0, color='gray', linestyle='--', alpha=0.5)
+    plt.axvline(0, color='red', linestyle='--', alpha=0.5, label='Day 0')
+    plt.xlabel('Trading Days Relative to Earnings')
+    plt.ylabel('Cumulative Average Return (%)')
+    plt.title('Cumulative Return Path Around Earnings by EPS Result')
+    plt.legend()
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def plot_reaction_heatmap(path, dpi, days, values, labels):
+    """Heatmap of average daily return by company and relative day"""
+    values = np.asarray(values)
+    limit = np.nanmax(np.abs(values)) if np.isfinite(values).any() else 1.0
+    plt.figure(figsize=(14, max(4, 0.4 * len(labels) + 2)))
+    sns.heatmap(values, cmap='RdYlGn', center=0, vmin=-limit, vmax=limit,
+                xticklabels=list(days), yticklabels=list(labels),
+                cbar_kws={'label': 'Average Daily Return (%)'})
+    plt.xlabel('Trading Days Relative to Earnings')
+    plt.ylabel('symbol')
+    plt.title('Average Daily Return Around Earnings by Company')
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+# ============================================================================
+# CACHED, PARALLEL RENDERING
+# ============================================================================
+
+def code_digest(code):
+    """
+    Digest of a code object: bytecode, names and constants (titles, labels,
+    colors, ...), recursing into nested functions and comprehensions
+    """
+    h = hashlib.sha256()
+    h.update(code.co_code)
+    h.update(repr((code.co_names, code.co_varnames)).encode())
+    for const in code.co_consts:
+        h.update(code_digest(const) if isinstance(const, types.CodeType) else repr(const).encode())
+    return h.digest()
+
+
+def chart_hash(func, dpi, data):
+    """Hash of a chart's drawing code, resolution and input arrays"""
+    h = hashlib.sha256()
+    h.update(func.__name__.encode())
+    h.update(code_digest(func.__code__))
+    h.update(str(dpi).encode())
+
+    for name in sorted(data):
+        arr = np.asarray(data[name])
+        h.update(name.encode())
+        h.update(str((arr.dtype, arr.shape)).encode())
+        h.update(arr.tobytes() if arr.dtype != object else repr(arr.tolist()).encode())
+
+    return h.hexdigest()
+
+
+def is_fresh(path, digest):
+    """True if the chart exists and was drawn from the same inputs"""
+    sidecar = path + '.sha256'
+    if not (os.path.exists(path) and os.path.exists(sidecar)):
+        return False
+    with open(sidecar, 'r', encoding='utf-8') as f:
+        return f.read().strip() == digest
+
+
+def draw_chart(func, path, dpi, data, digest):
+    """Worker entry point: draw one chart and record its input hash"""
+    func(path, dpi, **data)
+    with open(path + '.sha256', 'w', encoding='utf-8') as f:
+        f.write(digest)
+    return path
+
+
+def render_charts(charts, out_dir, dpi=CHART_DPI, fmt=CHART_FORMAT, workers=CHART_WORKERS):
+    """
+    Render charts = [(name, func, data), ...] into out_dir as <name>.<fmt>
+    Unchanged charts are skipped, the rest are drawn in parallel
+    Returns {name: 'saved' | 'unchanged'}
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    status = {}
+    pending = []
+    for name, func, data in charts:
+        path = os.path.join(out_dir, f'{name}.{fmt}')
+        digest = chart_hash(func, dpi, data)
+        if is_fresh(path, digest):
+            status[name] = 'unchanged'
+            print(f"   ⏭️ Unchanged: {os.path.basename(path)}")
+        else:
+            pending.append((name, func, path, data, digest))
+
+    if workers == 1 or len(pending) <= 1:
+        for name, func, path, data, digest in pending:
+            draw_chart(func, path, dpi, data, digest)
+            status[name] = 'saved'
+            print(f"   ✅ Saved: {os.path.basename(path)}")
+        return status
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            name: pool.submit(draw_chart, func, path, dpi, data, digest)
+            for name, func, path, data, digest in pending
+        }
+        for name, future in futures.items():
+            path = future.result()
+            status[name] = 'saved'
+            print(f"   ✅ Saved: {os.path.basename(path)}")
+
+    return status
@@ -0,0 +1,134 @@
+# scripts/compact_storage.py
+"""
+Compact SQLite storage for stock prices
+Symbol dictionary + integer day numbers + WITHOUT ROWID table,
+exposed through a stock_prices view for existing queries
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import config
+from config import SQL_DIR
+
+# 'table' = plain stock_prices table (default), 'compact' = layout below
+PRICE_STORAGE = getattr(config, 'PRICE_STORAGE', 'table')
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+# ============================================================================
+# SCHEMA
+# ============================================================================
+
+def stock_prices_type(conn):
+    """'table' (plain layout), 'view' (compact layout) or None if stock_prices does not exist"""
+    row = conn.execute(
+        "SELECT type FROM sqlite_master WHERE name = 'stock_prices'"
+    ).fetchone()
+    return row[0] if row else None
+
+
+def drop_stock_prices(conn):
+    """Drop stock_prices whether it is a plain table or the compact view"""
+    kind = stock_prices_type(conn)
+
+    if kind:
+        conn.execute(f"DROP {kind.upper()} stock_prices")
+
+
+def create_compact_schema(conn):
+    """Create the compact tables and replace stock_prices with the view"""
+    schema_file = os.path.join(SQL_DIR, '02_compact_stock_prices.sql')
+
+    with open(schema_file, 'r', encoding='utf-8') as f:
+        schema_sql = f.read()
+
+    drop_stock_prices(conn)
+    conn.executescript(schema_sql)
+    conn.commit()
+
+
+# ============================================================================
+# DAY NUMBERS
+# ============================================================================
+
+def to_day_numbers(dates):
+    """Convert dates to integer days since 1970-01-01"""
+    return pd.to_datetime(pd.Series(dates)).values.astype('datetime64[D]').astype(np.int64)
+
+
+def from_day_numbers(days):
+    """Convert integer day numbers back to datetime64 values"""
+    return np.asarray(days, dtype=np.int64).astype('datetime64[D]').astype('datetime64[ns]')
+
+
+# ============================================================================
+# LOAD / READ
+# ============================================================================
+
+def get_symbol_ids(conn, symbols):
+    """Register symbols in the dictionary and return {symbol: symbol_id}"""
+    conn.executemany(
+        "INSERT OR IGNORE INTO symbols (symbol) VALUES (?)",
+        [(s,) for s in symbols]
+    )
+    return dict(conn.execute("SELECT symbol, symbol_id FROM symbols").fetchall())
+
+
+def load_prices_compact(prices_df, conn):
+    """Upsert daily prices into the compact layout"""
+    create_compact_schema(conn)
+
+    symbol_ids = get_symbol_ids(conn, prices_df['symbol'].unique().tolist())
+
+    rows = pd.DataFrame({
+        'symbol_id': prices_df['symbol'].map(symbol_ids).to_numpy(),
+        'day': to_day_numbers(prices_df['date'])
+    })
+    for col in PRICE_COLUMNS:
+        rows[col] = prices_df[col].to_numpy() if col in prices_df.columns else None
+
+    conn.executemany(
+        "INSERT OR REPLACE INTO stock_prices_compact "
+        "(symbol_id, day, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        rows.itertuples(index=False, name=None)
+    )
+    conn.commit()
+
+    return len(rows)
+
+
+def read_prices_compact(conn, symbols=None, start=None, end=None):
+    """
+    Read prices straight from the clustered table
+    Symbol/date filters become range scans on (symbol_id, day)
+    """
+    where = []
+    params = []
+
+    if symbols is not None:
+        where.append(f"s.symbol IN ({', '.join('?' * len(symbols))})")
+        params.extend(symbols)
+    if start is not None:
+        where.append("p.day >= ?")
+        params.append(int(to_day_numbers([start])[0]))
+    if end is not None:
+        where.append("p.day <= ?")
+        params.append(int(to_day_numbers([end])[0]))
+
+    sql = (
+        "SELECT s.symbol, p.day, p.open, p.high, p.low, p.close, p.volume "
+        "FROM stock_prices_compact p JOIN symbols s ON s.symbol_id = p.symbol_id"
+    )
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY p.symbol_id, p.day"
+
+    df = pd.read_sql(sql, conn, params=params)
+    df.insert(1, 'date', from_day_numbers(df.pop('day')))
+
+    return df
@@ -0,0 +1,139 @@
+# scripts/delta_export.py
+"""
+Partitioned delta exports for incremental dashboard refresh
+Large tables are exported as one file per partition (month or year_quarter).
+A per-table manifest keeps each partition's row count and fingerprint; only
+partitions that were added or changed are rewritten. Changes are found by
+fingerprint rather than a date watermark because every load rewrites history
+(adjusted prices, recomputed metrics), which a watermark would not see.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import config
+from table_store import sqlite_path
+from fingerprint import partition_fingerprints
+from export_engine import EXPORT_FORMAT, EXPORT_WORKERS, EXPORT_EXTENSIONS, export_query
+
+# Write partitioned delta exports instead of one file per table
+DELTA_EXPORT = getattr(config, 'DELTA_EXPORT', False)
+
+# Table -> partition key SQL
+PARTITIONED_EXPORTS = {
+    'stock_prices': "substr(date, 1, 7)",
+    'earnings_dates': "substr(date, 1, 7)",
+    'earnings_analysis': "year_quarter"
+}
+
+MANIFEST_FILE = '_manifest.json'
+
+
+# ============================================================================
+# MANIFEST
+# ============================================================================
+
+def load_table_manifest(table_dir):
+    path = os.path.join(table_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_table_manifest(table_dir, manifest):
+    path = os.path.join(table_dir, MANIFEST_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+# ============================================================================
+# DELTA EXPORT
+# ============================================================================
+
+def partition_file(table, key, fmt=EXPORT_FORMAT):
+    return f"{table}_{key}{EXPORT_EXTENSIONS[fmt]}"
+
+
+def export_partitioned(conn, table, out_dir, fmt=EXPORT_FORMAT, workers=EXPORT_WORKERS, force=False):
+    """
+    Export a table as <out_dir>/<table>/<table>_<partition>.<ext>
+    Only new or changed partitions are written, vanished ones are deleted.
+    A partition that fails keeps its previous manifest entry, so it is retried next run.
+    Returns {'written': [...], 'unchanged': n, 'removed': [...], 'failed': {key: error}, 'rows': n}
+    """
+    key_sql = PARTITIONED_EXPORTS[table]
+    table_dir = os.path.join(out_dir, table)
+    os.makedirs(table_dir, exist_ok=True)
+
+    previous = load_table_manifest(table_dir)
+    previous_parts = previous.get('partitions', {})
+    same_format = previous.get('format') == fmt
+    old_parts = previous_parts if same_format else {}
+    current = partition_fingerprints(conn, table, f"COALESCE({key_sql}, 'unknown')")
+
+    stale = [
+        key for key, (rows, fingerprint) in current.items()
+        if force
+        or old_parts.get(key, {}).get('fingerprint') != fingerprint
+        or not os.path.exists(os.path.join(table_dir, partition_file(table, key, fmt)))
+    ]
+    removed = sorted(set(previous_parts) - set(current))
+
+    database_path = sqlite_path(conn)
+
+    def run(key):
+        sql = f'SELECT * FROM "{table}" WHERE COALESCE({key_sql}, \'unknown\') = ?'
+        try:
+            return export_query(database_path, sql, [key], os.path.join(table_dir, partition_file(table, key, fmt)), fmt)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, workers or 1)) as pool:
+        results = dict(zip(stale, pool.map(run, stale)))
+    written = {key: rows for key, rows in results.items() if not isinstance(rows, Exception)}
+    failed = {key: error for key, error in results.items() if isinstance(error, Exception)}
+
+    # Partitions that vanished, and every old file after a format switch
+    for key, entry in previous_parts.items():
+        path = os.path.join(table_dir, entry['file'])
+        if (key not in current or not same_format) and os.path.exists(path):
+            os.remove(path)
+
+    now = datetime.now().isoformat(timespec='seconds')
+
+    partitions = {}
+    for key, (rows, fingerprint) in sorted(current.items()):
+        entry = dict(old_parts.get(key, {}))
+        if key in failed:
+            if entry:
+                partitions[key] = entry
+            continue
+        if key in written or not entry:
+            entry = {'file': partition_file(table, key, fmt), 'updated_at': now}
+        entry.update({'rows': rows, 'fingerprint': fingerprint})
+        partitions[key] = entry
+
+    save_table_manifest(table_dir, {
+        'table': table,
+        'format': fmt,
+        'partition_key': key_sql,
+        'exported_at': now,
+        'partitions': partitions
+    })
+
+    return {
+        'written': sorted(written),
+        'unchanged': len(current) - len(results),
+        'removed': removed,
+        'failed': failed,
+        'rows': sum(written.values())
+    }
@@ -0,0 +1,220 @@
+# scripts/downsample.py
+"""
+Shape-preserving downsampling of price series for dashboard charts
+Largest-Triangle-Three-Buckets (LTTB) or min/max per bucket, per symbol,
+computed for all symbols at once on the flat price panel.
+Rows inside earnings windows are always kept at full resolution.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import config
+from config import PRE_EARNINGS_DAYS, POST_EARNINGS_DAYS
+from price_arrays import locate_events, load_price_panel
+from table_store import read_table
+from export_engine import EXPORT_FORMAT, export_path, write_batches
+
+# Also export downsampled price series in export_for_powerbi
+DOWNSAMPLE_EXPORT = getattr(config, 'DOWNSAMPLE_EXPORT', False)
+# Target points per symbol, one export file per resolution
+DOWNSAMPLE_POINTS = getattr(config, 'DOWNSAMPLE_POINTS', (250, 1000))
+# 'lttb' or 'minmax'
+DOWNSAMPLE_METHOD = getattr(config, 'DOWNSAMPLE_METHOD', 'lttb')
+
+DOWNSAMPLE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+# ============================================================================
+# BUCKETS
+# ============================================================================
+
+def bucket_edges(lengths, n_buckets):
+    """
+    Split the interior rows 1..L-2 of each series into n_buckets buckets
+    Returns an (n_series, n_buckets + 1) array of local row edges
+    """
+    k = np.arange(n_buckets + 1)
+    return 1 + (k[None, :] * (lengths[:, None] - 2)) // n_buckets
+
+
+def segment_argmax(values, seg_starts, n_segments):
+    """Index of the (first) maximum of each contiguous segment"""
+    seg_max = np.maximum.reduceat(values, seg_starts)
+    seg_id = np.repeat(np.arange(n_segments), np.diff(np.append(seg_starts, len(values))))
+    is_max = values == seg_max[seg_id]
+    # First position per segment where the maximum is reached
+    candidates = np.where(is_max, np.arange(len(values)), len(values))
+    return np.minimum.reduceat(candidates, seg_starts)
+
+
+# ============================================================================
+# METHODS (operate on many equal-bucket-count series at once)
+# ============================================================================
+
+def lttb_select(x, y, starts, lengths, n_points):
+    """
+    LTTB over several series stored back to back in x/y
+    starts/lengths: row range of each series (all longer than n_points)
+    Returns global row indices of the selected points (n_points per series)
+    """
+    n_series = len(starts)
+    n_buckets = n_points - 2
+    edges = starts[:, None] + bucket_edges(lengths, n_buckets)
+
+    # Bucket means via prefix sums
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    size = np.diff(edges, axis=1)
+    mean_x = (cx[edges[:, 1:]] - cx[edges[:, :-1]]) / size
+    mean_y = (cy[edges[:, 1:]] - cy[edges[:, :-1]]) / size
+
+    last = starts + lengths - 1
+    selected = np.empty((n_series, n_points), dtype=np.int64)
+    selected[:, 0] = starts
+    selected[:, -1] = last
+
+    prev = starts.copy()
+    for b in range(n_buckets):
+        # Third vertex: mean of the next bucket (last point for the final bucket)
+        if b + 1 < n_buckets:
+            nx, ny = mean_x[:, b + 1], mean_y[:, b + 1]
+        else:
+            nx, ny = x[last], y[last]
+
+        lo, hi = edges[:, b], edges[:, b + 1]
+        counts = hi - lo
+        seg_starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        rows = np.repeat(lo - seg_starts, counts) + np.arange(counts.sum())
+
+        owner = np.repeat(np.arange(n_series), counts)
+        ax, ay = x[prev][owner], y[prev][owner]
+        area = np.abs((ax - nx[owner]) * (y[rows] - ay) - (ax - x[rows]) * (ny[owner] - ay))
+
+        best = rows[segment_argmax(area, seg_starts, n_series)]
+        selected[:, b + 1] = best
+        prev = best
+
+    return selected.ravel()
+
+
+def minmax_select(y, starts, lengths, n_points):
+    """
+    Keep the first/last row and the min and max of each bucket
+    (n_points // 2 - 1 buckets, so about n_points rows per series)
+    """
+    n_series = len(starts)
+    n_buckets = max(n_points // 2 - 1, 1)
+    edges = starts[:, None] + bucket_edges(lengths, n_buckets)
+
+    lo = edges[:, :-1].ravel()
+    counts = np.diff(edges, axis=1).ravel()
+    seg_starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rows = np.repeat(lo - seg_starts, counts) + np.arange(counts.sum())
+
+    n_segments = n_series * n_buckets
+    hi_idx = rows[segment_argmax(y[rows], seg_starts, n_segments)]
+    lo_idx = rows[segment_argmax(-y[rows], seg_starts, n_segments)]
+
+    return np.concatenate([starts, starts + lengths - 1, hi_idx, lo_idx])
+
+
+# ============================================================================
+# PANEL
+# ============================================================================
+
+def event_window_mask(panel, symbols, event_dates,
+                      pre_days=PRE_EARNINGS_DAYS, post_days=POST_EARNINGS_DAYS):
+    """Boolean row mask of the panel: True inside any earnings window"""
+    loc = locate_events(panel, symbols, event_dates)
+    known = loc['end'] > loc['start']
+
+    lo = np.maximum(loc['pos'] - pre_days - 1, loc['start'])[known]
+    hi = np.minimum(loc['pos'] + post_days + 1, loc['end'])[known]
+    lo, hi = lo[hi > lo], hi[hi > lo]
+
+    # +1 at window start, -1 after its end, running sum > 0 inside a window
+    delta = np.zeros(len(panel['close']) + 1, dtype=np.int64)
+    np.add.at(delta, lo, 1)
+    np.add.at(delta, hi, -1)
+    return np.cumsum(delta[:-1]) > 0
+
+
+def downsample_panel(panel, n_points, method=DOWNSAMPLE_METHOD, keep=None, value='close'):
+    """
+    Row indices of the panel kept at a target of n_points per symbol
+    keep: optional boolean mask of rows that are always kept (earnings windows)
+    """
+    offsets = panel['offsets']
+    starts = offsets[:-1]
+    lengths = np.diff(offsets)
+    n_points = max(int(n_points), 3)
+
+    y = panel[value].astype(np.float64)
+    y = np.where(np.isnan(y), 0.0, y)
+    x = panel['date'].astype('datetime64[D]').astype(np.float64)
+
+    short = lengths <= n_points
+    picked = [np.arange(len(y))[np.repeat(short, lengths)]]
+
+    long_starts, long_lengths = starts[~short], lengths[~short]
+    if len(long_starts):
+        if method == 'minmax':
+            picked.append(minmax_select(y, long_starts, long_lengths, n_points))
+        elif method == 'lttb':
+            picked.append(lttb_select(x, y, long_starts, long_lengths, n_points))
+        else:
+            raise ValueError(f"Unknown downsampling method: {method}")
+
+    if keep is not None:
+        picked.append(np.flatnonzero(keep))
+
+    return np.unique(np.concatenate(picked))
+
+
+def downsampled_frame(panel, rows, keep=None):
+    """Long DataFrame of the selected panel rows"""
+    symbol_idx = np.searchsorted(panel['offsets'], rows, side='right') - 1
+
+    df = pd.DataFrame({
+        'symbol': np.asarray(panel['symbols'], dtype=object)[symbol_idx],
+        'date': pd.to_datetime(panel['date'][rows]).strftime('%Y-%m-%d')
+    })
+    for col in DOWNSAMPLE_COLUMNS:
+        df[col] = panel[col][rows]
+    df['in_earnings_window'] = keep[rows] if keep is not None else False
+
+    return df
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def downsampled_paths(out_dir, fmt=EXPORT_FORMAT, resolutions=DOWNSAMPLE_POINTS):
+    """Output file per resolution: stock_prices_<n>pts.<ext>"""
+    return {n: export_path(f'stock_prices_{n}pts', out_dir, fmt) for n in resolutions}
+
+
+def export_downsampled(conn, out_dir, fmt=EXPORT_FORMAT, resolutions=DOWNSAMPLE_POINTS,
+                       method=DOWNSAMPLE_METHOD):
+    """
+    Write one downsampled price file per resolution
+    Returns {path: rows written}
+    """
+    import pyarrow as pa
+
+    panel = load_price_panel(conn)
+    earnings = read_table(conn, 'earnings_dates', columns=['symbol', 'date'], parse_dates=True)
+    keep = event_window_mask(panel, earnings['symbol'], earnings['date'])
+
+    results = {}
+    for n, path in downsampled_paths(out_dir, fmt, resolutions).items():
+        df = downsampled_frame(panel, downsample_panel(panel, n, method, keep), keep)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        results[path] = write_batches(table.to_batches(), path, fmt, lambda: table.schema)
+
+    return results
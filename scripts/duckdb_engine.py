@@ -0,0 +1,144 @@
+# scripts/duckdb_engine.py
+"""
+Optional DuckDB analytical engine
+Runs the SQL views (sql/01) and analysis queries (sql/03) on a columnar,
+vectorized engine over the SQLite file or the Parquet store.
+Results come back as Arrow tables.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+import sqlite3
+from contextlib import closing
+import config
+from config import DATABASE_PATH, SQL_DIR
+from table_store import (
+    STORAGE_BACKEND,
+    PARQUET_DIR,
+    PARQUET_TABLES,
+    TABLES_WITH_YEAR,
+    read_sqlite_table
+)
+
+# 'sqlite' (default) or 'duckdb'
+ANALYSIS_ENGINE = getattr(config, 'ANALYSIS_ENGINE', 'sqlite')
+
+ENGINE_TABLES = [
+    'companies', 'stock_prices', 'earnings_dates', 'earnings_analysis',
+    'stock_prices_weekly', 'stock_prices_monthly', 'stock_prices_quarterly',
+    'earnings_window_sweep'
+]
+
+
+# ============================================================================
+# CONNECTION
+# ============================================================================
+
+def query_arrow(con, sql, params=None):
+    """Run a query and return the result as an Arrow table"""
+    result = con.execute(sql, params or [])
+    if hasattr(result, 'to_arrow_table'):
+        return result.to_arrow_table()
+    return result.fetch_arrow_table()
+
+
+def attach_sqlite(con, database_path=DATABASE_PATH):
+    """Attach the SQLite file read-only as 'src' (False if the extension is unavailable)"""
+    import duckdb
+
+    try:
+        con.execute("INSTALL sqlite")
+        con.execute("LOAD sqlite")
+        con.execute(f"ATTACH '{database_path}' AS src (TYPE sqlite, READ_ONLY)")
+        return True
+    except duckdb.Error as e:
+        print(f"   ⚠️ DuckDB sqlite extension unavailable ({e}), copying tables via Arrow")
+        return False
+
+
+def connect_duckdb(source=None, database_path=DATABASE_PATH):
+    """
+    Open an in-memory DuckDB database exposing the project tables and views
+    source: 'sqlite' or 'parquet' (defaults to the configured storage backend)
+    """
+    import duckdb
+    import pyarrow as pa
+
+    source = source or ('parquet' if STORAGE_BACKEND == 'parquet' else 'sqlite')
+
+    with closing(sqlite3.connect(database_path)) as sqlite_conn:
+        existing = {row[0] for row in sqlite_conn.execute("SELECT name FROM sqlite_master")}
+        sqlite_views = {row[0] for row in sqlite_conn.execute("SELECT name FROM sqlite_master WHERE type = 'view'")}
+
+        con = duckdb.connect()
+        attached = attach_sqlite(con, database_path)
+
+        for table in ENGINE_TABLES:
+            if source == 'parquet' and table in PARQUET_TABLES:
+                files = os.path.join(PARQUET_DIR, table, '**', '*.parquet')
+                exclude = '' if table in TABLES_WITH_YEAR else ' EXCLUDE (year)'
+                if not os.path.isdir(os.path.join(PARQUET_DIR, table)):
+                    print(f"   ⚠️ Skipping {table}: no Parquet data in {PARQUET_DIR}")
+                    continue
+                try:
+                    con.execute(
+                        f"CREATE VIEW {table} AS SELECT *{exclude} "
+                        f"FROM read_parquet('{files}', hive_partitioning = true)"
+                    )
+                except duckdb.Error as e:
+                    print(f"   ⚠️ Skipping {table}: {str(e).splitlines()[0]}")
+            elif table not in existing:
+                continue
+            elif attached and table not in sqlite_views:
+                con.execute(f"CREATE VIEW {table} AS SELECT * FROM src.{table}")
+            else:
+                # SQLite views (e.g. the compact stock_prices) use SQLite-only functions
+                con.register(f"{table}_arrow", pa.Table.from_pandas(
+                    read_sqlite_table(sqlite_conn, table), preserve_index=False
+                ))
+                con.execute(f"CREATE VIEW {table} AS SELECT * FROM {table}_arrow")
+
+    create_views(con)
+
+    return con
+
+
+# ============================================================================
+# VIEWS & ANALYSIS QUERIES
+# ============================================================================
+
+def create_views(con):
+    """Create the reporting views from sql/01_create_schema.sql"""
+    import duckdb
+
+    with open(os.path.join(SQL_DIR, '01_create_schema.sql'), 'r', encoding='utf-8') as f:
+        schema_sql = f.read()
+
+    for statement, name in re.findall(r'(CREATE VIEW\s+(\w+)\s+AS.*?);', schema_sql, re.S):
+        try:
+            con.execute(statement)
+        except duckdb.Error as e:
+            print(f"   ⚠️ Skipping view {name}: {str(e).splitlines()[0]}")
+
+
+def load_analysis_queries():
+    """Parse sql/03_analysis_queries.sql into {title: sql}"""
+    with open(os.path.join(SQL_DIR, '03_analysis_queries.sql'), 'r', encoding='utf-8') as f:
+        queries_sql = f.read()
+
+    queries = {}
+    for chunk in queries_sql.split(';'):
+        title = re.search(r'--\s*Query \d+:\s*(.+)', chunk)
+        body = '\n'.join(line for line in chunk.splitlines() if not line.strip().startswith('--')).strip()
+        if title and body:
+            queries[title.group(1).strip()] = body
+
+    return queries
+
+
+def run_analysis_queries(con):
+    """Run every analysis query, returning {title: Arrow table}"""
+    return {title: query_arrow(con, sql) for title, sql in load_analysis_queries().items()}
@@ -0,0 +1,172 @@
+# scripts/event_overlap.py
+"""
+Confounders of earnings windows
+An interval index over all event windows (pre_start_date .. post_end_date)
+answers overlap queries with two binary searches instead of a pairwise scan,
+and a macro calendar (FOMC, CPI, ...) read from a local CSV or Parquet file
+is matched to the windows the same way. Every event is annotated with the
+other companies reporting inside its window and the macro events it spans.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import config
+from config import STOCK_PRICES_RAW
+
+# Local macro calendar: one row per event with a date and an event name (e.g. 'FOMC', 'CPI')
+MACRO_CALENDAR_FILE = getattr(config, 'MACRO_CALENDAR_FILE',
+                              os.path.join(os.path.dirname(STOCK_PRICES_RAW), 'macro_events.csv'))
+
+CONFOUNDER_COLUMNS = ['n_overlapping_events', 'overlapping_symbols', 'n_macro_events', 'macro_events', 'is_clean']
+
+
+# ============================================================================
+# INTERVAL INDEX
+# ============================================================================
+
+def expand_ranges(first, last):
+    """Flatten row ranges [first, last) per query into (query positions, rows)"""
+    sizes = np.maximum(last - first, 0)
+    query = np.repeat(np.arange(len(first)), sizes)
+    offset = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return query, np.repeat(first, sizes) + offset
+
+
+class IntervalIndex:
+    """
+    Closed intervals [start, end] sorted by start
+    Overlap counts need one searchsorted on the sorted starts and one on the
+    sorted ends; listing overlaps only scans intervals whose start lies in
+    [query start - longest interval, query end].
+    """
+
+    def __init__(self, starts, ends):
+        starts = np.asarray(starts)
+        ends = np.asarray(ends)
+        self.order = np.argsort(starts, kind='stable')
+        self.starts = starts[self.order]
+        self.ends = ends[self.order]
+        self.sorted_ends = np.sort(ends)
+        self.max_length = (self.ends - self.starts).max() if len(starts) else np.timedelta64(0)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def count(self, lo, hi):
+        """Number of intervals overlapping each query [lo, hi]"""
+        started = np.searchsorted(self.starts, np.asarray(hi, dtype=self.starts.dtype), side='right')
+        finished = np.searchsorted(self.sorted_ends, np.asarray(lo, dtype=self.starts.dtype), side='left')
+        return started - finished
+
+    def overlaps(self, lo, hi):
+        """
+        All (query, interval) overlapping pairs
+        Returns (query positions, interval positions in the original order)
+        """
+        lo = np.asarray(lo, dtype=self.starts.dtype)
+        hi = np.asarray(hi, dtype=self.starts.dtype)
+        first = np.searchsorted(self.starts, lo - self.max_length, side='left')
+        last = np.searchsorted(self.starts, hi, side='right')
+
+        query, candidate = expand_ranges(first, last)
+        hit = self.ends[candidate] >= lo[query]
+        return query[hit], self.order[candidate[hit]]
+
+
+# ============================================================================
+# MACRO CALENDAR
+# ============================================================================
+
+def read_macro_calendar(path=MACRO_CALENDAR_FILE):
+    """Macro events (date, event) sorted by date, None if the file does not exist"""
+    if not os.path.exists(path):
+        return None
+
+    df = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+    columns = {c.strip().lower(): c for c in df.columns}
+    date_col = columns.get('date', df.columns[0])
+    name_col = columns.get('event', columns.get('name', df.columns[-1]))
+
+    calendar = pd.DataFrame({
+        'date': pd.to_datetime(df[date_col], errors='coerce').dt.normalize(),
+        'event': df[name_col].astype(str).str.strip()
+    })
+    return calendar.dropna(subset=['date']).sort_values('date', kind='stable').reset_index(drop=True)
+
+
+# ============================================================================
+# ANNOTATION
+# ============================================================================
+
+def join_labels(query, codes, labels, n):
+    """Per query, the sorted unique labels[codes] of its matches joined with ', ' ('' when none)"""
+    width = max(len(labels), 1)
+    keys = np.sort(np.asarray(query, dtype=np.int64) * width + codes)
+    keys = keys[np.concatenate([[True], np.diff(keys) != 0])] if len(keys) else keys
+    query, codes = np.divmod(keys, width)
+
+    joined = np.full(n, '', dtype=object)
+    labels = np.asarray(labels, dtype=object)
+    bounds = np.flatnonzero(np.diff(query)) + 1
+    for rows in np.split(np.arange(len(query)), bounds) if len(query) else []:
+        joined[query[rows[0]]] = ', '.join(labels[codes[rows]])
+    return joined
+
+
+def annotate_confounders(symbols, window_start, window_end, calendar=None):
+    """
+    Confounders of every event window
+    Windows of other symbols overlapping the event's window count as
+    overlapping events; macro events dated inside the window as macro events.
+    Returns {column: array} for CONFOUNDER_COLUMNS
+    """
+    # Symbol and macro labels as codes into sorted uniques, so labels join in sorted order
+    symbol_codes, symbol_names = pd.factorize(np.asarray(symbols, dtype=object), sort=True)
+    lo = pd.to_datetime(window_start).to_numpy(dtype='datetime64[ns]')
+    hi = pd.to_datetime(window_end).to_numpy(dtype='datetime64[ns]')
+    n = len(symbol_codes)
+
+    index = IntervalIndex(lo, hi)
+    query, other = index.overlaps(lo, hi)
+    keep = symbol_codes[query] != symbol_codes[other]
+    query, other = query[keep], other[keep]
+
+    result = {
+        'n_overlapping_events': np.bincount(query, minlength=n).astype(np.int64),
+        'overlapping_symbols': join_labels(query, symbol_codes[other], symbol_names, n)
+    }
+
+    if calendar is not None and len(calendar):
+        dates = calendar['date'].to_numpy(dtype='datetime64[ns]')
+        first = np.searchsorted(dates, lo, side='left')
+        last = np.searchsorted(dates, hi, side='right')
+        macro_query, macro_row = expand_ranges(first, last)
+        label_codes, labels = pd.factorize(calendar['event'] + ' ' + calendar['date'].dt.strftime('%Y-%m-%d'), sort=True)
+        result['n_macro_events'] = (last - first).astype(np.int64)
+        result['macro_events'] = join_labels(macro_query, label_codes[macro_row], labels, n)
+    else:
+        result['n_macro_events'] = np.zeros(n, dtype=np.int64)
+        result['macro_events'] = np.full(n, '', dtype=object)
+
+    result['is_clean'] = (result['n_overlapping_events'] == 0) & (result['n_macro_events'] == 0)
+    return result
+
+
+def clean_events(analysis, calendar=None):
+    """
+    Events with no overlapping earnings window and no macro event
+    Uses the stored is_clean column, or annotates the windows on the fly
+    for tables written before it existed
+    """
+    if 'is_clean' in analysis.columns:
+        return analysis[analysis['is_clean'].astype(bool)]
+
+    calendar = calendar if calendar is not None else read_macro_calendar()
+    flags = annotate_confounders(
+        analysis['symbol'], analysis['pre_start_date'], analysis['post_end_date'], calendar
+    )['is_clean']
+    return analysis[flags]
@@ -0,0 +1,193 @@
+# scripts/event_stats.py
+"""
+Event-study significance tests
+Cross-sectional t, Patell Z, BMP (standardized cross-sectional) t and a sign
+test, all derived from additive per-group sums: count, sum, sum of squares and
+wins of the reaction, plus sums of standardized CARs and their variances.
+The sums are cube measures, so any slice or grouping is tested by adding
+cells - one grouped pass serves every company, EPS category and quarter.
+p-values are two-sided: Student t (df = n - 1) for the cross-sectional and
+BMP t, an exact binomial test for the sign test and the normal distribution
+for Patell Z.
+"""
+
+import math
+import numpy as np
+import pandas as pd
+from olap_cube import EarningsCube
+
+SCAR_COLUMN = 'scar_post'
+PATELL_COLUMN = 'patell_var'
+
+# Report name -> cube dimensions
+SIGNIFICANCE_GROUPS = {
+    'symbol': ['symbol'],
+    'eps_category': ['eps_category'],
+    'year_quarter': ['year', 'quarter']
+}
+
+
+# ============================================================================
+# STANDARDIZED ABNORMAL RETURNS
+# ============================================================================
+
+def standardize(analysis):
+    """
+    Add scar_post (CAR / its standard error) and patell_var ((T - 2) / (T - 4),
+    the variance of a standardized CAR with T estimation days) when the market
+    model columns are present; otherwise return the frame unchanged
+    """
+    if 'car_post_se_pct' not in analysis.columns:
+        return analysis
+
+    df = analysis.copy()
+    se = df['car_post_se_pct'].to_numpy(dtype=np.float64)
+    days = df['est_days'].to_numpy(dtype=np.float64)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scar = np.where(se > 0, df['car_post_pct'].to_numpy(dtype=np.float64) / se, np.nan)
+        ok = ~np.isnan(scar) & (days > 4)
+        df[SCAR_COLUMN] = np.where(ok, scar, np.nan)
+        df[PATELL_COLUMN] = np.where(ok, (days - 2) / (days - 4), np.nan)
+
+    return df
+
+
+def test_value(columns):
+    """Reaction to test: market-adjusted CAR when available, raw post return otherwise"""
+    return 'car_post_pct' if 'car_post_pct' in columns else 'post_return_pct'
+
+
+# ============================================================================
+# TESTS FROM ADDITIVE SUMS
+# ============================================================================
+
+_erfc = np.frompyfunc(math.erfc, 1, 1)
+
+
+def p_value(z):
+    """Two-sided p-value of a standard normal statistic (NaN stays NaN)"""
+    z = np.asarray(z, dtype=np.float64)
+    return _erfc(np.abs(z) / math.sqrt(2)).astype(np.float64)
+
+
+def _beta_fraction(a, b, x, iterations=300, eps=1e-15):
+    """Continued fraction of the incomplete beta function (modified Lentz)"""
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, iterations + 1):
+        for num in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                    -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + num * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + num / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < eps:
+            break
+    return h
+
+
+def betainc(a, b, x):
+    """Regularized incomplete beta function I_x(a, b) (NaN stays NaN)"""
+    if math.isnan(x) or not (a > 0 and b > 0):
+        return math.nan
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log1p(-x))
+    # The continued fraction converges fast for x < (a + 1) / (a + b + 2)
+    if x < (a + 1) / (a + b + 2):
+        return front * _beta_fraction(a, b, x) / a
+    return 1.0 - front * _beta_fraction(b, a, 1 - x) / b
+
+
+_betainc = np.frompyfunc(betainc, 3, 1)
+
+
+def t_p_value(t, df):
+    """Two-sided p-value of a Student t statistic with df degrees of freedom"""
+    t = np.asarray(t, dtype=np.float64)
+    df = np.asarray(df, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return _betainc(df / 2, 0.5, df / (df + t ** 2)).astype(np.float64)
+
+
+def sign_p_value(wins, count):
+    """
+    Two-sided exact binomial p-value of `wins` positives out of `count` vs 50%
+    P(X <= m) for X ~ Binomial(n, 1/2) is I_1/2(n - m, m + 1)
+    """
+    wins = np.asarray(wins, dtype=np.float64)
+    count = np.asarray(count, dtype=np.float64)
+    tail = np.minimum(wins, count - wins)
+    with np.errstate(invalid='ignore'):
+        cdf = np.where(tail < count, _betainc(count - tail, tail + 1, 0.5).astype(np.float64), 1.0)
+        return np.where((count > 0) & ~np.isnan(wins), np.minimum(1.0, 2 * cdf), np.nan)
+
+
+def derive_significance(totals, value='post_return_pct'):
+    """
+    Test statistics from summed cube measures (<measure>_<stat> columns)
+    t_stat: cross-sectional t of `value`; sign_z: share of positive reactions vs 50%
+    (sign_p is the exact binomial test); patell_z / bmp_t: standardized CAR tests
+    (only when scar_post sums are present)
+    """
+    count = totals[f'{value}_count'].astype(np.float64)
+    total = totals[f'{value}_sum']
+    wins = totals[f'{value}_wins']
+
+    result = pd.DataFrame(index=totals.index)
+    result['events'] = count.astype(np.int64)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        var = (totals[f'{value}_sumsq'] - total ** 2 / count) / (count - 1)
+        result['mean'] = mean
+        result['t_stat'] = (mean / np.sqrt(var.clip(lower=0) / count)).where(count > 1)
+        result['t_p'] = t_p_value(result['t_stat'], count - 1)
+
+        result['pct_positive'] = wins / count * 100
+        result['sign_z'] = ((2 * wins - count) / np.sqrt(count)).where(count > 0)
+        result['sign_p'] = sign_p_value(wins, count)
+
+        scar_sum_col = f'{SCAR_COLUMN}_sum'
+        if scar_sum_col in totals.columns:
+            n = totals[f'{SCAR_COLUMN}_count'].astype(np.float64)
+            scar_sum = totals[scar_sum_col]
+            scar_mean = scar_sum / n
+            scar_var = (totals[f'{SCAR_COLUMN}_sumsq'] - scar_sum ** 2 / n) / (n - 1)
+
+            result['patell_z'] = (scar_sum / np.sqrt(totals[f'{PATELL_COLUMN}_sum'])).where(n > 0)
+            result['patell_p'] = p_value(result['patell_z'])
+            result['bmp_t'] = (scar_mean / np.sqrt(scar_var.clip(lower=0) / n)).where(n > 1)
+            result['bmp_p'] = t_p_value(result['bmp_t'], n - 1)
+
+    return result
+
+
+def cube_significance(cube, dimensions=(), value=None):
+    """Significance tests for any roll-up of the cube (empty dimensions = all events)"""
+    value = value or test_value(cube.values)
+    values = [v for v in (value, SCAR_COLUMN, PATELL_COLUMN) if v in cube.values]
+    return derive_significance(cube.totals(dimensions, values), value)
+
+
+def event_study_tests(analysis, groups=SIGNIFICANCE_GROUPS, value=None, cube=None):
+    """
+    Significance per group for every grouping in `groups`, plus 'all'
+    Pass a cube built from standardize(analysis) to reuse it.
+    Returns {name: DataFrame}
+    """
+    cube = cube or EarningsCube.build(standardize(analysis))
+    value = value or test_value(cube.values)
+
+    results = {'all': cube_significance(cube, (), value)}
+    for name, dimensions in groups.items():
+        results[name] = cube_significance(cube, dimensions, value)
+
+    return results
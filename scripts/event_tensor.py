@@ -0,0 +1,142 @@
+# scripts/event_tensor.py
+"""
+Event-time return tensor
+Daily returns of every earnings event from day -W to day +W, built by
+fancy indexing into the flat price panel and stored as a memory-mapped
+.npy matrix (events x relative day) next to an event index CSV.
+Analysis slices it for cumulative reaction curves and heatmaps without
+touching raw prices again.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import config
+from config import PROCESSED_DATA_DIR
+from price_arrays import locate_events, load_price_panel
+from table_store import read_table
+
+# Build the tensor in the pipeline after calculate_all_metrics (opt-in)
+EVENT_TENSOR = getattr(config, 'EVENT_TENSOR', False)
+EVENT_WINDOW_DAYS = getattr(config, 'EVENT_WINDOW_DAYS', 20)
+EVENT_TENSOR_DIR = getattr(config, 'EVENT_TENSOR_DIR', os.path.join(PROCESSED_DATA_DIR, 'event_tensor'))
+
+RETURNS_FILE = 'returns.npy'
+EVENTS_FILE = 'events.csv'
+
+
+# ============================================================================
+# BUILD
+# ============================================================================
+
+def daily_returns(panel):
+    """Simple daily returns (%) of the panel, NaN on each symbol's first row"""
+    close = panel['close']
+    returns = np.full(len(close), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = (close[1:] / close[:-1] - 1) * 100
+    returns[panel['offsets'][:-1][np.diff(panel['offsets']) > 0]] = np.nan
+    return returns
+
+
+def event_return_matrix(panel, symbols, event_dates, window=EVENT_WINDOW_DAYS, out=None):
+    """
+    events x (2 * window + 1) matrix of daily returns around day 0
+    (first trading day on/after the announcement); NaN outside the symbol's history
+    out: optional preallocated array (e.g. a memmap) to fill
+    """
+    loc = locate_events(panel, symbols, event_dates)
+    days = np.arange(-window, window + 1)
+    rows = loc['pos'][:, None] + days[None, :]
+    inside = (rows >= loc['start'][:, None]) & (rows < loc['end'][:, None])
+
+    returns = daily_returns(panel)
+    values = np.where(inside, returns[np.clip(rows, 0, max(len(returns) - 1, 0))], np.nan)
+
+    if out is None:
+        return values
+    out[:] = values
+    return out
+
+
+def build_event_tensor(conn, window=EVENT_WINDOW_DAYS, out_dir=EVENT_TENSOR_DIR):
+    """Build and persist the event-time return tensor for all earnings events"""
+    print("\n" + "="*80)
+    print("EVENT-TIME RETURN TENSOR")
+    print("="*80)
+
+    panel = load_price_panel(conn)
+    events = read_table(conn, 'earnings_dates', columns=['symbol', 'date'], parse_dates=True)
+    events = events.rename(columns={'date': 'earnings_date'})
+    events = events[events['earnings_date'].notna() & events['symbol'].isin(panel['symbols'])]
+    events = events.sort_values(['symbol', 'earnings_date']).reset_index(drop=True)
+
+    # Categories for slicing, from the metric engine
+    events['earnings_date'] = events['earnings_date'].astype(str)
+    categories = read_table(conn, 'earnings_analysis', columns=['symbol', 'earnings_date', 'eps_category', 'reaction_category'])
+    events = events.merge(categories, on=['symbol', 'earnings_date'], how='left')
+    events[['eps_category', 'reaction_category']] = events[['eps_category', 'reaction_category']].fillna('Unknown')
+
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, RETURNS_FILE)
+    matrix = np.lib.format.open_memmap(path, mode='w+', dtype='<f8', shape=(len(events), 2 * window + 1))
+    event_return_matrix(panel, events['symbol'], pd.to_datetime(events['earnings_date']), window, out=matrix)
+    matrix.flush()
+    del matrix
+
+    events.index.name = 'row'
+    events.to_csv(os.path.join(out_dir, EVENTS_FILE))
+
+    print(f"\n   ✅ {len(events)} events x {2 * window + 1} days (day -{window} to +{window})")
+    print(f"   📁 {out_dir}")
+
+    return path
+
+
+# ============================================================================
+# LOAD & SLICE
+# ============================================================================
+
+def has_event_tensor(out_dir=EVENT_TENSOR_DIR):
+    return all(os.path.exists(os.path.join(out_dir, f)) for f in (RETURNS_FILE, EVENTS_FILE))
+
+
+def load_event_tensor(out_dir=EVENT_TENSOR_DIR):
+    """
+    Open the tensor read-only (memory-mapped, nothing is read until sliced)
+    Returns (matrix, events, days)
+    """
+    matrix = np.load(os.path.join(out_dir, RETURNS_FILE), mmap_mode='r')
+    events = pd.read_csv(os.path.join(out_dir, EVENTS_FILE), index_col='row')
+    window = (matrix.shape[1] - 1) // 2
+    return matrix, events, np.arange(-window, window + 1)
+
+
+def mean_returns_by(matrix, events, days, by):
+    """Average daily return per group and relative day (groups x days)"""
+    codes, groups = pd.factorize(events[by], sort=True)
+    valid = ~np.isnan(matrix)
+
+    sums = np.zeros((len(groups), len(days)))
+    counts = np.zeros((len(groups), len(days)))
+    np.add.at(sums, codes, np.where(valid, matrix, 0.0))
+    np.add.at(counts, codes, valid)
+
+    with np.errstate(invalid='ignore'):
+        means = sums / counts
+
+    return pd.DataFrame(means, index=pd.Index(groups, name=by), columns=pd.Index(days, name='day'))
+
+
+def car_curves(matrix, events, days, by='eps_category', start=None):
+    """
+    Cumulative average return paths (CAAR) per group, cumulated from day `start`
+    (default: first day of the window); rows = relative day, columns = groups
+    """
+    means = mean_returns_by(matrix, events, days, by)
+    if start is not None:
+        means = means.loc[:, days >= start]
+    return means.fillna(0.0).cumsum(axis=1).T
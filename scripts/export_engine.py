@@ -0,0 +1,279 @@
+# scripts/export_engine.py
+"""
+Streaming table export
+Tables are read as Arrow record batches and written chunk by chunk, so memory
+stays bounded by one batch per table. Several tables are exported in parallel
+(one thread and one SQLite connection per table).
+Formats: CSV, zstd-compressed Parquet, Arrow IPC (Feather v2).
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import config
+from table_store import (
+    BATCH_ROWS,
+    PARQUET_COMPRESSION,
+    PARQUET_DIR,
+    TABLES_WITH_YEAR,
+    sqlite_path,
+    uses_parquet,
+    iter_query_batches,
+    iter_table_batches
+)
+
+# 'csv' (default), 'parquet' or 'feather'
+EXPORT_FORMAT = getattr(config, 'EXPORT_FORMAT', 'csv')
+EXPORT_WORKERS = getattr(config, 'EXPORT_WORKERS', 4)
+
+EXPORT_EXTENSIONS = {
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'feather': '.feather'
+}
+
+
+# ============================================================================
+# WRITERS
+# ============================================================================
+
+class CsvBatchWriter:
+    """
+    Append batches to a CSV file (header from the first batch)
+    Integer columns listed in float_columns are written as floats in every
+    batch, as pandas does for a whole integer column that contains NULLs
+    """
+
+    def __init__(self, path, schema, float_columns=()):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.names = schema.names
+        self.float_columns = set(float_columns)
+        self.header = True
+
+    def write(self, batch):
+        df = batch.to_pandas()
+        for col in self.float_columns.intersection(df.columns):
+            if pd.api.types.is_integer_dtype(df[col]):
+                df[col] = df[col].astype(float)
+        df.to_csv(self.file, header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        if self.header:
+            # No rows: header only
+            pd.DataFrame(columns=self.names).to_csv(self.file, index=False)
+        self.file.close()
+
+
+class ArrowBatchWriter:
+    """Write batches to Parquet or Arrow IPC, cast to the first batch's schema"""
+
+    def __init__(self, path, schema, fmt):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.schema = schema
+        if fmt == 'parquet':
+            self.writer = pq.ParquetWriter(path, schema, compression=PARQUET_COMPRESSION)
+        else:
+            self.writer = pa.ipc.new_file(
+                path, schema, options=pa.ipc.IpcWriteOptions(compression='zstd')
+            )
+
+    def write(self, batch):
+        import pyarrow as pa
+
+        if not batch.schema.equals(self.schema):
+            # pandas-chunk fallback can infer different types per chunk
+            batch = pa.Table.from_batches([batch]).cast(self.schema).to_batches()[0]
+        self.writer.write_batch(batch)
+
+    def close(self):
+        self.writer.close()
+
+
+def open_writer(path, schema, fmt, float_columns=()):
+    if fmt == 'csv':
+        return CsvBatchWriter(path, schema, float_columns)
+    return ArrowBatchWriter(path, schema, fmt)
+
+
+def write_batches(batches, path, fmt=EXPORT_FORMAT, schema=None, float_columns=()):
+    """
+    Stream record batches into path
+    schema: called for the file's schema when batches yields nothing, so an
+    empty result still writes a header-only CSV or an empty Parquet/Feather file
+    float_columns: CSV only, see CsvBatchWriter
+    Written to a temporary file first so a failed export never leaves a partial file
+    Returns the number of rows written
+    """
+    tmp_path = path + '.tmp'
+    writer = None
+    rows = 0
+
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = open_writer(tmp_path, batch.schema, fmt, float_columns)
+            writer.write(batch)
+            rows += batch.num_rows
+        if writer is None:
+            if schema is None:
+                return 0
+            writer = open_writer(tmp_path, schema(), fmt, float_columns)
+    except Exception:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    writer.close()
+    os.replace(tmp_path, path)
+
+    return rows
+
+
+# ============================================================================
+# SCHEMA AND NULLS
+# ============================================================================
+
+def sqlite_arrow_type(declared):
+    """Arrow type of a declared SQLite column type (by SQLite's affinity rules)"""
+    import pyarrow as pa
+
+    declared = (declared or '').upper()
+    if 'INT' in declared:
+        return pa.int64()
+    if any(t in declared for t in ('REAL', 'FLOA', 'DOUB')):
+        return pa.float64()
+    return pa.string()
+
+
+def parquet_dataset(table):
+    """The table's Parquet dataset, None if the table is stored in SQLite"""
+    import pyarrow.dataset as ds
+
+    path = os.path.join(PARQUET_DIR, table)
+    if not uses_parquet(table) or not os.path.isdir(path):
+        return None
+    return ds.dataset(path, format='parquet', partitioning='hive')
+
+
+def parquet_columns(dataset, table):
+    return [c for c in dataset.schema.names if c != 'year' or table in TABLES_WITH_YEAR]
+
+
+def query_columns(conn, sql, params=None):
+    return [d[0] for d in conn.execute(f"SELECT * FROM ({sql}) LIMIT 0", params or []).description]
+
+
+def query_schema(conn, sql, params=None):
+    """Schema of an empty query result (names only, no types to infer)"""
+    import pyarrow as pa
+
+    return pa.schema([(name, pa.null()) for name in query_columns(conn, sql, params)])
+
+
+def table_schema(conn, table):
+    """Schema of a table from the Parquet dataset or the declared SQLite types"""
+    import pyarrow as pa
+
+    dataset = parquet_dataset(table)
+    if dataset is not None:
+        return pa.schema([dataset.schema.field(c) for c in parquet_columns(dataset, table)])
+
+    info = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+    return pa.schema([(name, sqlite_arrow_type(declared)) for _, name, declared, *_ in info])
+
+
+def query_null_columns(conn, sql, params=None):
+    """Columns of a query result with at least one NULL"""
+    columns = query_columns(conn, sql, params)
+    if not columns:
+        return []
+    checks = ', '.join(f'MAX("{c}" IS NULL)' for c in columns)
+    flags = conn.execute(f"SELECT {checks} FROM ({sql})", params or []).fetchone()
+    return [c for c, flag in zip(columns, flags) if flag]
+
+
+def table_null_columns(conn, table):
+    """Columns of a table with at least one NULL (Parquet: counted per column)"""
+    import pyarrow.dataset as ds
+
+    dataset = parquet_dataset(table)
+    if dataset is None:
+        return query_null_columns(conn, f'SELECT * FROM "{table}"')
+
+    return [
+        c for c in parquet_columns(dataset, table)
+        if dataset.count_rows(filter=ds.field(c).is_null())
+    ]
+
+
+# ============================================================================
+# TABLE EXPORT
+# ============================================================================
+
+def export_path(table, out_dir, fmt=EXPORT_FORMAT):
+    return os.path.join(out_dir, f"{table}{EXPORT_EXTENSIONS[fmt]}")
+
+
+def export_table(database_path, table, path, fmt=EXPORT_FORMAT, batch_rows=BATCH_ROWS):
+    """
+    Export one table (runs in a worker thread with its own connection)
+    Retries with pandas chunks if the native reader rejects the table
+    (e.g. a column whose SQLite type changes mid-table)
+    """
+    conn = sqlite3.connect(database_path)
+    try:
+        float_columns = table_null_columns(conn, table) if fmt == 'csv' else ()
+        schema = lambda: table_schema(conn, table)
+        try:
+            return write_batches(iter_table_batches(conn, table, batch_rows), path, fmt, schema, float_columns)
+        except Exception:
+            return write_batches(iter_table_batches(conn, table, batch_rows, use_adbc=False), path, fmt,
+                                 schema, float_columns)
+    finally:
+        conn.close()
+
+
+def export_query(database_path, sql, params, path, fmt=EXPORT_FORMAT, batch_rows=BATCH_ROWS):
+    """Export the result of one SQLite query (same fallback as export_table)"""
+    conn = sqlite3.connect(database_path)
+    try:
+        float_columns = query_null_columns(conn, sql, params) if fmt == 'csv' else ()
+        schema = lambda: query_schema(conn, sql, params)
+        try:
+            return write_batches(iter_query_batches(conn, sql, params, batch_rows), path, fmt, schema, float_columns)
+        except Exception:
+            return write_batches(iter_query_batches(conn, sql, params, batch_rows, use_adbc=False), path, fmt,
+                                 schema, float_columns)
+    finally:
+        conn.close()
+
+
+def export_tables(conn, tables, out_dir, fmt=EXPORT_FORMAT, workers=EXPORT_WORKERS):
+    """
+    Export tables in parallel
+    Returns {table: rows written or the exception raised}
+    """
+    if fmt not in EXPORT_EXTENSIONS:
+        raise ValueError(f"Unknown export format: {fmt} (expected one of {', '.join(EXPORT_EXTENSIONS)})")
+
+    database_path = sqlite_path(conn)
+    if database_path is None:
+        raise ValueError("Streaming export needs a file-backed SQLite database")
+
+    def run(table):
+        try:
+            return export_table(database_path, table, export_path(table, out_dir, fmt), fmt)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, workers or 1)) as pool:
+        return dict(zip(tables, pool.map(run, tables)))
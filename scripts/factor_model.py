@@ -0,0 +1,165 @@
+# scripts/factor_model.py
+"""
+Multi-factor abnormal returns
+Daily factor returns (e.g. a Fama-French CSV: date, Mkt-RF, SMB, HML, RF) are
+read from a local CSV or Parquet file. Every event's estimation window is
+gathered into one stacked design matrix (events x days x factors) and all
+regressions are solved together with a single batched np.linalg.solve.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+import numpy as np
+import pandas as pd
+import config
+from config import STOCK_PRICES_RAW
+from event_tensor import daily_returns
+from abnormal_returns import (
+    ESTIMATION_WINDOW_DAYS,
+    ESTIMATION_GAP_DAYS,
+    MIN_ESTIMATION_DAYS,
+    align_to_panel,
+    estimation_window
+)
+
+# Add factor-adjusted columns to earnings_analysis
+FACTOR_MODEL = getattr(config, 'FACTOR_MODEL', False)
+FACTOR_FILE = getattr(config, 'FACTOR_FILE', os.path.join(os.path.dirname(STOCK_PRICES_RAW), 'factors.csv'))
+# Factor columns to use (None = every numeric column except the risk-free rate)
+FACTOR_COLUMNS = getattr(config, 'FACTOR_COLUMNS', None)
+# Multiplier to percent: 1 for files in percent (Fama-French), 100 for decimal returns
+FACTOR_SCALE = getattr(config, 'FACTOR_SCALE', 1.0)
+
+RISK_FREE_COLUMN = 'RF'
+
+
+# ============================================================================
+# FACTOR FILE
+# ============================================================================
+
+def factor_key(name):
+    """Column-safe factor name: 'Mkt-RF' -> 'mkt_rf'"""
+    return re.sub(r'[^0-9a-z]+', '_', str(name).lower()).strip('_')
+
+
+def read_factor_file(path=FACTOR_FILE, columns=FACTOR_COLUMNS, scale=FACTOR_SCALE):
+    """
+    Daily factor returns (%) sorted by date, None if the file does not exist
+    The date column may be text or YYYYMMDD integers (Fama-French layout)
+    Returns (factors DataFrame with a 'date' column, factor names, risk-free column or None)
+    """
+    if not os.path.exists(path):
+        return None
+
+    df = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+    df.columns = [str(c).strip() for c in df.columns]
+    date_col = next((c for c in df.columns if c.lower() == 'date'), df.columns[0])
+
+    dates = df[date_col]
+    if pd.api.types.is_integer_dtype(dates):
+        dates = pd.to_datetime(dates.astype(str), format='%Y%m%d')
+    df = df.drop(columns=date_col)
+    df.insert(0, 'date', pd.to_datetime(dates))
+
+    if columns is None:
+        columns = [
+            c for c in df.columns[1:]
+            if c != RISK_FREE_COLUMN and pd.api.types.is_numeric_dtype(df[c])
+        ]
+    risk_free = RISK_FREE_COLUMN if RISK_FREE_COLUMN in df.columns else None
+
+    values = df[list(columns) + ([risk_free] if risk_free else [])].astype(np.float64) * scale
+    df = pd.concat([df[['date']], values], axis=1)
+    df = df.dropna(subset=['date']).sort_values('date').reset_index(drop=True)
+
+    return df, list(columns), risk_free
+
+
+# ============================================================================
+# BATCHED REGRESSION
+# ============================================================================
+
+def stacked_rows(lo, hi, length):
+    """(events, length) panel rows lo, lo+1, ... and a mask of those below hi"""
+    rows = lo[:, None] + np.arange(length)[None, :]
+    return rows, rows < hi[:, None]
+
+
+def factor_model(panel, factors, names, risk_free, start, pre_start, day0, post_end,
+                 est_days=ESTIMATION_WINDOW_DAYS, gap=ESTIMATION_GAP_DAYS, min_days=MIN_ESTIMATION_DAYS):
+    """
+    Factor loadings per event and abnormal returns over its windows
+    Rows as in abnormal_returns.market_model; returns are in excess of the
+    risk-free rate when the file has one. Estimation days missing any factor
+    are masked out of the stacked design matrices.
+    Returns {column: array}: factor_alpha_pct, loading_<factor>..., factor_sigma_pct,
+    factor_est_days, factor_abnormal_immediate_pct, factor_car_pre_pct,
+    factor_car_post_pct, factor_car_total_pct
+    """
+    n_events = len(day0)
+    n_factors = len(names)
+    last = max(len(panel['close']) - 1, 0)
+
+    aligned = align_to_panel(panel, factors['date'], factors[names].to_numpy())
+    rf = align_to_panel(panel, factors['date'], factors[risk_free]) if risk_free else np.zeros(len(aligned))
+
+    # Design row per panel row: [1, f1, f2, ...], target = excess stock return
+    design = np.concatenate([np.ones((len(aligned), 1)), aligned], axis=1)
+    target = daily_returns(panel) - rf
+    usable = ~np.isnan(target) & ~np.isnan(design).any(axis=1)
+
+    # Stacked estimation windows: (events, est_days, 1 + factors)
+    est_lo, est_hi = estimation_window(start, pre_start, est_days, gap)
+    rows, inside = stacked_rows(est_lo, est_hi, est_days)
+    rows = np.clip(rows, 0, last)
+    mask = inside & usable[rows]
+
+    X = np.where(mask[:, :, None], design[rows], 0.0)
+    y = np.where(mask, target[rows], 0.0)
+    n = mask.sum(axis=1)
+
+    XtX = np.einsum('edi,edj->eij', X, X)
+    Xty = np.einsum('edi,ed->ei', X, y)
+
+    ok = n >= max(min_days, n_factors + 2)
+    if n_events:
+        ok &= np.linalg.cond(np.where(ok[:, None, None], XtX, np.eye(n_factors + 1))) < 1e12
+    # Unusable events get an identity system so the batch solve never hits a singular matrix
+    XtX[~ok] = np.eye(n_factors + 1)
+    coef = np.linalg.solve(XtX, Xty[:, :, None])[:, :, 0]
+    coef[~ok] = np.nan
+
+    residuals = np.where(mask, y - np.einsum('edi,ei->ed', X, coef), 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = np.sqrt((residuals ** 2).sum(axis=1) / (n - n_factors - 1))
+
+    # Event window: return rows pre_start+1 .. post_end, same stacking
+    span = int((post_end - pre_start).max()) if n_events else 0
+    ev_rows, ev_inside = stacked_rows(pre_start + 1, post_end + 1, span)
+    ev_rows = np.clip(ev_rows, 0, last)
+    ev_mask = ev_inside & usable[ev_rows]
+    abnormal = np.where(ev_mask, target[ev_rows] - np.einsum('edi,ei->ed', design[ev_rows], coef), 0.0)
+
+    def cumulative(lo, hi):
+        """Sum of abnormal returns over return rows [lo, hi)"""
+        sel = ev_mask & (ev_rows >= lo[:, None]) & (ev_rows < hi[:, None])
+        return np.where(sel.any(axis=1), (abnormal * sel).sum(axis=1), np.nan)
+
+    result = {'factor_alpha_pct': coef[:, 0]}
+    for i, name in enumerate(names):
+        result[f'loading_{factor_key(name)}'] = coef[:, i + 1]
+    result.update({
+        'factor_sigma_pct': np.where(ok, sigma, np.nan),
+        'factor_est_days': n.astype(np.int64),
+        'factor_abnormal_immediate_pct': np.where(
+            post_end > day0, cumulative(day0 + 1, np.minimum(day0 + 2, post_end + 1)), np.nan
+        ),
+        'factor_car_pre_pct': cumulative(pre_start + 1, day0),
+        'factor_car_post_pct': cumulative(day0 + 1, post_end + 1),
+        'factor_car_total_pct': cumulative(pre_start + 1, post_end + 1)
+    })
+
+    return result
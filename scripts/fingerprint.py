@@ -0,0 +1,228 @@
+# scripts/fingerprint.py
+"""
+Data fingerprints and the artifact manifest
+A table's fingerprint is a content hash: every row (with its rowid, so
+reordering counts) gets pandas' vectorized 64-bit row hash, summed over one
+chunked scan. The hash is cached against the database file's header (change
+counter, page count, schema cookie), so while nothing has been written the
+fingerprint costs one header read instead of a table scan. Artifacts (reports, CSV exports, charts) are recorded in a
+manifest with the fingerprint they were built from, and are only
+regenerated when it changes.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from config import PROCESSED_DATA_DIR
+from table_store import BATCH_ROWS, sqlite_path, iter_query_batches
+
+MANIFEST_PATH = os.path.join(PROCESSED_DATA_DIR, 'manifest.json')
+FINGERPRINT_CACHE_PATH = os.path.join(PROCESSED_DATA_DIR, 'fingerprint_cache.json')
+
+
+# ============================================================================
+# FINGERPRINTS
+# ============================================================================
+
+def row_hashes(df):
+    """64-bit hash of every row's values (column order and dtypes included)"""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+
+
+def query_chunks(conn, sql):
+    """
+    A query's result as DataFrame chunks, read through Arrow batches (ADBC sees
+    committed data only) or, if that fails, chunked pd.read_sql
+    """
+    try:
+        batches = list(iter_query_batches(conn, sql))
+    except Exception:
+        # e.g. a column whose SQLite type changes mid-table
+        batches = None
+
+    if batches is None:
+        yield from pd.read_sql(sql, conn, chunksize=BATCH_ROWS)
+    else:
+        for batch in batches:
+            yield batch.to_pandas()
+
+
+def content_hashes(conn, sql, key=None):
+    """
+    Row count and sum (mod 2^64) of the row hashes of a query's result, read in chunks
+    key: result column to group by (excluded from the hash); returns {key: (rows, hash)}
+    or (rows, hash) without a key
+    """
+    totals = {}
+    for chunk in query_chunks(conn, sql):
+        keys = chunk.pop(key).to_numpy(dtype=object) if key else np.zeros(len(chunk), dtype=object)
+        codes, uniques = pd.factorize(keys)
+        sums = np.zeros(len(uniques), dtype=np.uint64)
+        np.add.at(sums, codes, row_hashes(chunk))
+        counts = np.bincount(codes, minlength=len(uniques))
+        for k, n, h in zip(uniques, counts, sums):
+            rows, total = totals.get(k, (0, 0))
+            totals[k] = (rows + int(n), (total + int(h)) % (1 << 64))
+
+    result = {k: (rows, f'{total:016x}') for k, (rows, total) in totals.items()}
+    return result if key else result.get(0, (0, f'{0:016x}'))
+
+
+def table_columns(conn, table):
+    return [c[1] for c in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def database_version(conn):
+    """
+    Signature of a SQLite file's committed state: file change counter, page
+    count and schema cookie from the header, plus size and mtime. Any committed
+    write changes it. None when it cannot be trusted: in-memory database, WAL
+    mode (the header is only updated on checkpoints) or an open transaction
+    """
+    path = sqlite_path(conn)
+    if path is None or conn.in_transaction or not os.path.exists(path):
+        return None
+
+    with open(path, 'rb') as f:
+        header = f.read(100)
+    if len(header) < 100 or header[18] == 2:
+        return None
+
+    stat = os.stat(path)
+    fields = [int.from_bytes(header[i:i + 4], 'big') for i in (24, 28, 40)]
+    return f"{fields[0]}:{fields[1]}:{fields[2]}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def load_fingerprint_cache(path=FINGERPRINT_CACHE_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_fingerprint_cache(cache, path=FINGERPRINT_CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def table_fingerprint(conn, table, cache_path=FINGERPRINT_CACHE_PATH):
+    """
+    Fingerprint a SQLite table or view
+    Reuses the cached hash while the database file is unchanged (cache_path=None: always scan)
+    Returns None if it does not exist
+    """
+    row = conn.execute(
+        "SELECT type, sql FROM sqlite_master WHERE name = ? AND type IN ('table', 'view')", (table,)
+    ).fetchone()
+    if row is None:
+        return None
+
+    version = database_version(conn) if cache_path else None
+    key = f"{os.path.abspath(sqlite_path(conn) or '')}::{table}"
+    cache = load_fingerprint_cache(cache_path) if version else {}
+    cached = cache.get(key, {})
+    if version and cached.get('version') == version:
+        return cached['fingerprint']
+
+    columns = table_columns(conn, table)
+    has_rowid = row[0] == 'table' and 'WITHOUT ROWID' not in (row[1] or '').upper()
+    select = (['rowid AS "__rowid"'] if has_rowid else []) + [f'"{c}"' for c in columns]
+    values = content_hashes(conn, f'SELECT {", ".join(select)} FROM "{table}"')
+
+    h = hashlib.sha256()
+    h.update(repr((table, columns, values)).encode())
+    fingerprint = h.hexdigest()
+
+    # Only cache if nothing was committed during the scan
+    if version and database_version(conn) == version:
+        cache[key] = {'version': version, 'fingerprint': fingerprint}
+        save_fingerprint_cache(cache, cache_path)
+
+    return fingerprint
+
+
+def partition_fingerprints(conn, table, key_sql):
+    """
+    Fingerprint every partition of a table in one scan
+    key_sql: SQL expression giving the partition key of a row
+    Returns {key: (rows, fingerprint)}
+    """
+    columns = table_columns(conn, table)
+    select = ', '.join(f'"{c}"' for c in columns)
+    hashes = content_hashes(conn, f'SELECT {key_sql} AS "__partition", {select} FROM "{table}"', key='__partition')
+
+    result = {}
+    for key, values in hashes.items():
+        h = hashlib.sha256()
+        h.update(repr((table, columns, values)).encode())
+        result[key] = (values[0], h.hexdigest())
+
+    return result
+
+
+def file_fingerprint(path):
+    """SHA-256 of a file's bytes, None if it does not exist"""
+    if not os.path.exists(path):
+        return None
+
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def combine_fingerprints(*parts):
+    """One fingerprint from several (table fingerprints, settings, ...)"""
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+# ============================================================================
+# MANIFEST
+# ============================================================================
+
+class Manifest:
+    """JSON map of artifact path -> fingerprint it was generated from"""
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @staticmethod
+    def key(artifact):
+        return os.path.abspath(artifact)
+
+    def is_fresh(self, artifact, fingerprint):
+        """True if the artifact exists and was built from this fingerprint"""
+        return (
+            fingerprint is not None and
+            os.path.exists(artifact) and
+            self.entries.get(self.key(artifact)) == fingerprint
+        )
+
+    def all_fresh(self, artifacts, fingerprint):
+        return all(self.is_fresh(a, fingerprint) for a in artifacts)
+
+    def record(self, artifact, fingerprint):
+        self.entries[self.key(artifact)] = fingerprint
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
@@ -0,0 +1,156 @@
+# scripts/group_stats.py
+"""
+Single-pass grouped statistics
+count, mean, std, min, max, win rate and quantiles for any grouping keys,
+computed with bincount/sort array operations (no groupby.apply lambdas)
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_VALUE = 'post_return_pct'
+DEFAULT_QUANTILES = (0.25, 0.5, 0.75)
+
+
+# ============================================================================
+# GROUP CODES
+# ============================================================================
+
+def group_codes(df, keys):
+    """
+    Factorize grouping keys
+    Returns (codes, index): codes[i] is the group of row i (-1 = missing key),
+    index holds the sorted group labels
+    """
+    keys = list(keys)
+
+    if not keys:
+        return np.zeros(len(df), dtype=np.int64), pd.Index(['All'])
+
+    if len(keys) == 1:
+        codes, uniques = pd.factorize(df[keys[0]], sort=True)
+        return codes.astype(np.int64), pd.Index(uniques, name=keys[0])
+
+    codes, uniques = pd.factorize(pd.MultiIndex.from_frame(df[keys]), sort=True)
+    return codes.astype(np.int64), pd.MultiIndex.from_tuples(uniques, names=keys)
+
+
+# ============================================================================
+# STATISTICS
+# ============================================================================
+
+def sorted_group_quantiles(values, codes, n_groups, count, quantiles):
+    """min, max and linear-interpolated quantiles per group from one sort"""
+    valid = ~np.isnan(values)
+    order = np.lexsort((values[valid], codes[valid]))
+    ordered = values[valid][order]
+
+    start = np.concatenate([[0], np.cumsum(count)[:-1]])
+    has_data = count > 0
+    last = np.where(has_data, start + count - 1, start)
+
+    def pick(pos):
+        out = np.full(n_groups, np.nan)
+        out[has_data] = ordered[pos[has_data]]
+        return out
+
+    result = {'min': pick(start), 'max': pick(last)}
+    for q in quantiles:
+        pos = (count - 1).clip(min=0) * q
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.ceil(pos).astype(np.int64)
+        low, high = pick(start + lo), pick(start + hi)
+        result[f'q{int(round(q * 100))}'] = low + (high - low) * (pos - lo)
+
+    return result
+
+
+def grouped_stats(df, keys, value=DEFAULT_VALUE, means=(), quantiles=DEFAULT_QUANTILES):
+    """
+    Grouped statistics of `value` in one vectorized pass
+    Columns: n_rows, count, sum, sumsq, wins, mean, std, min, max,
+    win_rate (% of non-missing values > 0, as in the bootstrap intervals), quantiles, and <col>_mean for `means`
+    """
+    codes, index = group_codes(df, keys)
+    keep = codes >= 0
+    codes = codes[keep]
+    n_groups = len(index)
+
+    values = df[value].to_numpy(dtype=np.float64)[keep]
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+
+    n_rows = np.bincount(codes, minlength=n_groups)
+    count = np.bincount(codes, weights=valid, minlength=n_groups).astype(np.int64)
+    total = np.bincount(codes, weights=filled, minlength=n_groups)
+    sumsq = np.bincount(codes, weights=filled ** 2, minlength=n_groups)
+    wins = np.bincount(codes, weights=filled > 0, minlength=n_groups).astype(np.int64)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        # Second pass around the mean for a numerically stable std
+        dev = np.where(valid, values - mean[codes], 0.0)
+        std = np.sqrt(np.bincount(codes, weights=dev ** 2, minlength=n_groups) / (count - 1))
+        std[count < 2] = np.nan
+        win_rate = wins / count * 100
+
+    stats = pd.DataFrame({
+        'n_rows': n_rows,
+        'count': count,
+        'sum': total,
+        'sumsq': sumsq,
+        'wins': wins,
+        'mean': mean,
+        'std': std,
+        'win_rate': win_rate
+    }, index=index)
+
+    for name, col in sorted_group_quantiles(values, codes, n_groups, count, quantiles).items():
+        stats[name] = col
+
+    for col in means:
+        other = df[col].to_numpy(dtype=np.float64)[keep]
+        ok = ~np.isnan(other)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stats[f'{col}_mean'] = (
+                np.bincount(codes, weights=np.where(ok, other, 0.0), minlength=n_groups) /
+                np.bincount(codes, weights=ok, minlength=n_groups)
+            )
+
+    return stats
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class GroupStats:
+    """
+    Memoized grouped_stats over one DataFrame
+    Report functions share one instance so each grouping is computed once
+    """
+
+    def __init__(self, df, means=('immediate_return_pct', 'eps_surprise_pct')):
+        self.df = df
+        self.means = [col for col in means if col in df.columns]
+        self._cache = {}
+
+    def by(self, keys=(), value=DEFAULT_VALUE):
+        """Statistics per group of `keys` (empty keys = one overall row)"""
+        key = (tuple(keys), value)
+        if key not in self._cache:
+            self._cache[key] = grouped_stats(self.df, keys, value, self.means)
+        return self._cache[key]
+
+    def intervals(self, keys=(), value=DEFAULT_VALUE):
+        """Bootstrap confidence intervals of mean and win rate per group (see bootstrap.py)"""
+        from bootstrap import bootstrap_stats
+
+        key = ('intervals', tuple(keys), value)
+        if key not in self._cache:
+            self._cache[key] = bootstrap_stats(self.df, keys, value)
+        return self._cache[key]
+
+    def overall(self, value=DEFAULT_VALUE):
+        """Statistics over the whole frame as a Series"""
+        return self.by((), value).iloc[0]
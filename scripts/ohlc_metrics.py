@@ -0,0 +1,102 @@
+# scripts/ohlc_metrics.py
+"""
+OHLC reaction metrics
+Opening gap and intraday range on day 0, plus average true range (ATR) and
+Parkinson / Garman-Klass realized volatility before and after earnings.
+Per-day values are computed once over the flat price panel; every window
+mean is a difference of prefix sums, so all events cost one gather each.
+"""
+
+import numpy as np
+
+TRADING_DAYS = 252
+
+OHLC_COLUMNS = [
+    'gap_pct', 'day0_range_pct',
+    'atr_pre_pct', 'atr_post_pct',
+    'parkinson_vol_pre_pct', 'parkinson_vol_post_pct',
+    'gk_vol_pre_pct', 'gk_vol_post_pct'
+]
+
+
+# ============================================================================
+# PER-DAY VALUES
+# ============================================================================
+
+def previous_close(panel):
+    """Close of the previous row, NaN on each symbol's first row"""
+    close = panel['close']
+    prev = np.full(len(close), np.nan)
+    prev[1:] = close[:-1]
+    prev[panel['offsets'][:-1][np.diff(panel['offsets']) > 0]] = np.nan
+    return prev
+
+
+def daily_ranges(panel):
+    """
+    Per-row true range (% of the previous close) and Parkinson / Garman-Klass
+    daily variances (log units); NaN where a price is missing or not positive
+    """
+    o, h, l, c = panel['open'], panel['high'], panel['low'], panel['close']
+    prev = previous_close(panel)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        true_range = (np.fmax(h, prev) - np.fmin(l, prev)) / prev * 100
+        true_range[np.isnan(prev) | np.isnan(h) | np.isnan(l)] = np.nan
+
+        hl = np.log(h / l)
+        co = np.log(c / o)
+        parkinson = hl ** 2 / (4 * np.log(2))
+        garman_klass = 0.5 * hl ** 2 - (2 * np.log(2) - 1) * co ** 2
+
+    bad = ~((o > 0) & (h > 0) & (l > 0) & (c > 0))
+    parkinson[bad] = np.nan
+    garman_klass[bad] = np.nan
+
+    return {'atr': true_range, 'parkinson': parkinson, 'gk': garman_klass}
+
+
+def prefix_sums(values):
+    """Running sum and count of the non-NaN values, with a leading zero"""
+    valid = ~np.isnan(values)
+    return (np.concatenate([[0.0], np.cumsum(np.where(valid, values, 0.0))]),
+            np.concatenate([[0], np.cumsum(valid)]))
+
+
+def window_mean(sums, lo, hi):
+    """Mean over rows [lo, hi) per event from prefix_sums output, NaN if the window has no values"""
+    total, count = sums
+    n = count[hi] - count[lo]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(n > 0, (total[hi] - total[lo]) / n, np.nan)
+
+
+# ============================================================================
+# EVENT METRICS
+# ============================================================================
+
+def ohlc_metrics(panel, pre_start, day0, post_end):
+    """
+    Gap, range, ATR and realized volatility per event
+    Rows as in calculate_all_metrics. The pre window is the sessions
+    pre_start + 1 .. day 0 - 1, the post window day 0 .. post_end (so the
+    day-0 reaction counts as post). Volatilities are annualized, in %.
+    Returns {column: array} for OHLC_COLUMNS
+    """
+    prev = previous_close(panel)
+    sums = {k: prefix_sums(v) for k, v in daily_ranges(panel).items()}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = {
+            'gap_pct': (panel['open'][day0] / prev[day0] - 1) * 100,
+            'day0_range_pct': (panel['high'][day0] - panel['low'][day0]) / prev[day0] * 100
+        }
+
+        windows = {'pre': (pre_start + 1, day0), 'post': (day0, post_end + 1)}
+        for side, (lo, hi) in windows.items():
+            result[f'atr_{side}_pct'] = window_mean(sums['atr'], lo, hi)
+            for name, key in (('parkinson_vol', 'parkinson'), ('gk_vol', 'gk')):
+                variance = window_mean(sums[key], lo, hi)
+                result[f'{name}_{side}_pct'] = np.sqrt(np.maximum(variance, 0) * TRADING_DAYS) * 100
+
+    return {col: result[col] for col in OHLC_COLUMNS}
@@ -0,0 +1,110 @@
+# scripts/olap_cube.py
+"""
+In-memory OLAP cube over earnings_analysis
+Additive statistics (count, sum, sum of squares, wins) per
+symbol x year x quarter x eps_category x reaction_category cell.
+Any slice or roll-up is a sum over cells - no rescan of the event table.
+"""
+
+import numpy as np
+import pandas as pd
+from group_stats import grouped_stats
+
+CUBE_DIMENSIONS = ['symbol', 'year', 'quarter', 'eps_category', 'reaction_category']
+# Measures missing from earnings_analysis are skipped (abnormal returns are optional)
+CUBE_VALUES = ['post_return_pct', 'immediate_return_pct', 'car_post_pct', 'scar_post', 'patell_var',
+               'abnormal_volume_post_pct']
+ADDITIVE_STATS = ['n_rows', 'count', 'sum', 'sumsq', 'wins']
+
+CUBE_FILE = 'earnings_cube.csv'
+
+
+# ============================================================================
+# CUBE
+# ============================================================================
+
+class EarningsCube:
+    """Cube of additive measures; cells is one row per non-empty dimension combination"""
+
+    def __init__(self, cells, dimensions=CUBE_DIMENSIONS, values=CUBE_VALUES):
+        self.cells = cells
+        self.dimensions = list(dimensions)
+        self.values = list(values)
+
+    @classmethod
+    def build(cls, analysis, dimensions=CUBE_DIMENSIONS, values=CUBE_VALUES):
+        """Build the cube from earnings_analysis in one grouped pass per measure"""
+        values = [v for v in values if v in analysis.columns]
+
+        parts = []
+        for value in values:
+            stats = grouped_stats(analysis, dimensions, value, quantiles=())[ADDITIVE_STATS]
+            stats.columns = [f'{value}_{stat}' for stat in ADDITIVE_STATS]
+            parts.append(stats)
+
+        cells = pd.concat(parts, axis=1).reset_index()
+        return cls(cells, dimensions, values)
+
+    def save(self, path):
+        """Write the cells to .parquet or .csv (by extension)"""
+        if path.endswith('.parquet'):
+            self.cells.to_parquet(path, index=False, compression='zstd')
+        else:
+            self.cells.to_csv(path, index=False)
+        return path
+
+    @classmethod
+    def load(cls, path, dimensions=CUBE_DIMENSIONS, values=CUBE_VALUES):
+        cells = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+        values = [v for v in values if f'{v}_count' in cells.columns]
+        return cls(cells, dimensions, values)
+
+    def slice(self, **filters):
+        """Keep cells matching dimension filters, e.g. slice(symbol='AAPL', year=[2024, 2025])"""
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dim, wanted in filters.items():
+            if isinstance(wanted, (list, tuple, set)):
+                mask &= self.cells[dim].isin(list(wanted)).to_numpy()
+            else:
+                mask &= (self.cells[dim] == wanted).to_numpy()
+
+        return EarningsCube(self.cells[mask].reset_index(drop=True), self.dimensions, self.values)
+
+    def totals(self, dimensions=(), values=None):
+        """Additive measures summed up to `dimensions` (empty = grand total)"""
+        values = self.values if values is None else list(values)
+        columns = [f'{value}_{stat}' for value in values for stat in ADDITIVE_STATS]
+        dimensions = list(dimensions)
+
+        if dimensions:
+            return self.cells.groupby(dimensions, sort=True)[columns].sum()
+        return self.cells[columns].sum().to_frame('All').T
+
+    def rollup(self, dimensions=(), value='post_return_pct'):
+        """
+        Aggregate cells up to `dimensions` (empty = grand total)
+        Returns count, mean, std and win rate derived from the additive measures
+        """
+        totals = self.totals(dimensions, [value])
+        totals.columns = ADDITIVE_STATS
+        return derive_stats(totals)
+
+
+# ============================================================================
+# DERIVED MEASURES
+# ============================================================================
+
+def derive_stats(totals):
+    """mean / std / win rate from n_rows, count, sum, sumsq, wins columns"""
+    count = totals['count'].astype(np.float64)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = totals['sum'] / count
+        var = (totals['sumsq'] - totals['sum'] ** 2 / count) / (count - 1)
+
+    result = totals.copy()
+    result['mean'] = mean
+    result['std'] = np.sqrt(var.clip(lower=0)).where(count > 1)
+    result['win_rate'] = totals['wins'] / totals['count'] * 100
+
+    return result
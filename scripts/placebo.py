@@ -0,0 +1,122 @@
+# scripts/placebo.py
+"""
+Placebo-date permutation test
+Each earnings event is moved to random non-earnings trading days of the same
+symbol, keeping its EPS surprise. The post-window returns of all placebo
+draws are gathered from the flat price panel at once, giving the null
+distribution of the "sell the news" rate and the win rate.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import config
+from config import PRE_EARNINGS_DAYS, POST_EARNINGS_DAYS
+from price_arrays import locate_events
+from downsample import event_window_mask
+from bootstrap import run_chunks
+
+# Run the test in the analysis report (it reads the full price panel)
+PLACEBO_TEST = getattr(config, 'PLACEBO_TEST', False)
+# Placebo sets (each moves every event once); events x sets placebo windows in total
+PLACEBO_SAMPLES = getattr(config, 'PLACEBO_SAMPLES', 10000)
+PLACEBO_SEED = getattr(config, 'PLACEBO_SEED', 42)
+PLACEBO_WORKERS = getattr(config, 'PLACEBO_WORKERS', None)
+
+
+# ============================================================================
+# CALENDAR
+# ============================================================================
+
+def placebo_candidates(panel, earnings_symbols, earnings_dates,
+                       pre_days=PRE_EARNINGS_DAYS, post_days=POST_EARNINGS_DAYS):
+    """
+    Panel rows usable as a placebo day 0: the whole pre/post window fits in the
+    symbol's history and does not touch any real earnings window
+    Returns (rows sorted by symbol, per-symbol start into rows, per-symbol count)
+    """
+    n = len(panel['close'])
+    offsets = panel['offsets']
+    symbol_idx = np.repeat(np.arange(len(panel['symbols'])), np.diff(offsets))
+    row = np.arange(n)
+
+    lo = row - pre_days - 1
+    hi = row + post_days
+    fits = (lo >= offsets[symbol_idx]) & (hi < offsets[symbol_idx + 1])
+
+    # Rows inside real windows, counted with a prefix sum over each candidate window
+    busy = np.concatenate([[0], np.cumsum(event_window_mask(panel, earnings_symbols, earnings_dates,
+                                                            pre_days, post_days))])
+    clean = fits.copy()
+    clean[fits] = busy[hi[fits] + 1] - busy[lo[fits]] == 0
+
+    rows = row[clean]
+    counts = np.bincount(symbol_idx[clean], minlength=len(panel['symbols']))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    return rows, starts, counts
+
+
+# ============================================================================
+# PERMUTATIONS
+# ============================================================================
+
+def placebo_chunk(close, rows, cand_start, cand_count, beat, post_days, n_sets, seed):
+    """
+    Sell-the-news rate and win rate (%) of n_sets placebo sets
+    Every event draws one candidate day 0 of its own symbol per set
+    """
+    rng = np.random.default_rng(seed)
+    pick = cand_start + rng.integers(0, cand_count, size=(n_sets, len(cand_count)))
+    day0 = rows[pick]
+
+    post_return = close[day0 + post_days] / close[day0] - 1
+    sell_news = ((post_return < 0) & beat).mean(axis=1) * 100
+    win_rate = (post_return > 0).mean(axis=1) * 100
+    return sell_news, win_rate
+
+
+def permutation_p_value(null, observed):
+    """Two-sided p-value: share of null draws at least as far from the null mean"""
+    null = np.asarray(null)
+    distance = np.abs(null - null.mean())
+    return (1 + np.sum(distance >= abs(observed - null.mean()) - 1e-12)) / (len(null) + 1)
+
+
+def placebo_test(analysis, panel, earnings, n_sets=PLACEBO_SAMPLES, seed=PLACEBO_SEED, workers=PLACEBO_WORKERS,
+                 pre_days=PRE_EARNINGS_DAYS, post_days=POST_EARNINGS_DAYS):
+    """
+    Null distribution of the sell-the-news and win rates from placebo dates
+    analysis: earnings_analysis rows (symbol, eps_surprise_pct, post_return_pct);
+    earnings: every announcement (symbol, date), kept out of placebo windows.
+    Returns {'events', 'windows', 'observed', 'null', 'p_value'}; observed/null/p_value
+    are keyed 'sell_news_rate' and 'win_rate'
+    """
+    rows, starts, counts = placebo_candidates(panel, earnings['symbol'], earnings['date'], pre_days, post_days)
+
+    sym_idx = pd.Index(panel['symbols']).get_indexer(analysis['symbol'])
+    known = sym_idx >= 0
+    known[known] = counts[sym_idx[known]] > 0
+    events = analysis[known]
+    sym_idx = sym_idx[known]
+
+    beat = (events['eps_surprise_pct'] > 0).to_numpy()
+    post = events['post_return_pct'].to_numpy(dtype=np.float64)
+    observed = {
+        'sell_news_rate': np.mean(beat & (post < 0)) * 100,
+        'win_rate': np.mean(post > 0) * 100
+    }
+
+    data = (panel['close'], rows, starts[sym_idx], counts[sym_idx], beat, post_days)
+    sell_news, win_rate = run_chunks(placebo_chunk, data, n_sets, len(events), seed, workers)
+    null = {'sell_news_rate': sell_news, 'win_rate': win_rate}
+
+    return {
+        'events': len(events),
+        'windows': n_sets * len(events),
+        'observed': observed,
+        'null': null,
+        'p_value': {k: permutation_p_value(null[k], observed[k]) for k in null}
+    }
@@ -0,0 +1,189 @@
+# scripts/price_arrays.py
+"""
+Columnar price arrays
+Keeps each symbol's date/open/high/low/close/volume as contiguous numpy arrays,
+optionally persisted as one SQLite BLOB per symbol-year (loaded with np.frombuffer)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import config
+from table_store import read_table
+
+# Also write per symbol-year blobs in load_to_sql and read them in the metric engine
+PRICE_BLOBS = getattr(config, 'PRICE_BLOBS', False)
+
+# Column -> on-disk dtype (little-endian so blobs are portable)
+ARRAY_COLUMNS = {
+    'date': '<M8[ns]',
+    'open': '<f8',
+    'high': '<f8',
+    'low': '<f8',
+    'close': '<f8',
+    'volume': '<f8'
+}
+
+# stock_prices columns needed to build a panel
+PRICE_TABLE_COLUMNS = ['symbol'] + list(ARRAY_COLUMNS)
+
+CREATE_BLOBS_SQL = f"""
+CREATE TABLE IF NOT EXISTS price_blobs (
+    symbol TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    n_rows INTEGER NOT NULL,
+    {', '.join(f'{col} BLOB' for col in ARRAY_COLUMNS)},
+    PRIMARY KEY (symbol, year)
+) WITHOUT ROWID
+"""
+
+
+# ============================================================================
+# PANEL: ALL SYMBOLS IN ONE SET OF FLAT ARRAYS
+# ============================================================================
+# A panel is a dict:
+#   'symbols' -> list of symbols (sorted)
+#   'offsets' -> int64 array, rows of symbols[k] are offsets[k]:offsets[k+1]
+#   one flat array per column in ARRAY_COLUMNS, sorted by (symbol, date)
+
+def frame_to_panel(prices_df):
+    """Build a panel from a stock_prices DataFrame"""
+    df = prices_df.sort_values(['symbol', 'date'], kind='stable')
+
+    codes, symbols = pd.factorize(df['symbol'], sort=True)
+    offsets = np.searchsorted(codes, np.arange(len(symbols) + 1))
+
+    panel = {'symbols': list(symbols), 'offsets': offsets.astype(np.int64)}
+    panel['date'] = pd.to_datetime(df['date']).to_numpy(dtype='datetime64[ns]')
+    for col in ARRAY_COLUMNS:
+        if col != 'date':
+            panel[col] = df[col].to_numpy(dtype=np.float64) if col in df.columns else np.full(len(df), np.nan)
+
+    return panel
+
+
+def symbol_series(panel, symbol):
+    """Return {column: array} views for one symbol (no copy)"""
+    k = panel['symbols'].index(symbol)
+    lo, hi = panel['offsets'][k], panel['offsets'][k + 1]
+    return {col: panel[col][lo:hi] for col in ARRAY_COLUMNS}
+
+
+def locate_events(panel, symbols, dates):
+    """
+    Locate events in the panel
+    Returns dict of int64 arrays:
+      'start', 'end' -> row range of the event's symbol (empty if unknown)
+      'pos'          -> first row with date >= event date (day 0)
+    """
+    symbols = np.asarray(symbols)
+    dates = np.asarray(dates, dtype='datetime64[ns]')
+    offsets = panel['offsets']
+
+    sym_idx = pd.Index(panel['symbols']).get_indexer(symbols)
+    known = sym_idx >= 0
+
+    start = np.zeros(len(dates), dtype=np.int64)
+    end = np.zeros(len(dates), dtype=np.int64)
+    pos = np.zeros(len(dates), dtype=np.int64)
+    start[known] = offsets[sym_idx[known]]
+    end[known] = offsets[sym_idx[known] + 1]
+
+    # One searchsorted per symbol that has events
+    order = np.argsort(sym_idx, kind='stable')
+    sorted_idx = sym_idx[order]
+    bounds = np.searchsorted(sorted_idx, np.arange(len(panel['symbols']) + 1))
+    for k in np.unique(sorted_idx[sorted_idx >= 0]):
+        rows = order[bounds[k]:bounds[k + 1]]
+        lo, hi = offsets[k], offsets[k + 1]
+        pos[rows] = lo + np.searchsorted(panel['date'][lo:hi], dates[rows], side='left')
+
+    return {'start': start, 'end': end, 'pos': pos}
+
+
+# ============================================================================
+# BLOB STORE (one row per symbol-year)
+# ============================================================================
+
+def write_price_blobs(prices_df, conn):
+    """
+    Write prices as per symbol-year column blobs
+    Symbol-years present in prices_df are replaced as a whole
+    """
+    panel = frame_to_panel(prices_df)
+    conn.execute(CREATE_BLOBS_SQL)
+
+    years = panel['date'].astype('datetime64[Y]').astype(np.int64) + 1970
+    cuts = np.union1d(panel['offsets'], np.flatnonzero(np.diff(years)) + 1)
+
+    rows = []
+    for k, symbol in enumerate(panel['symbols']):
+        lo, hi = panel['offsets'][k], panel['offsets'][k + 1]
+        seg = cuts[(cuts >= lo) & (cuts <= hi)]
+        for a, b in zip(seg[:-1], seg[1:]):
+            rows.append(
+                (symbol, int(years[a]), int(b - a)) +
+                tuple(np.ascontiguousarray(panel[col][a:b], dtype=dtype).tobytes()
+                      for col, dtype in ARRAY_COLUMNS.items())
+            )
+
+    conn.executemany(
+        f"INSERT OR REPLACE INTO price_blobs VALUES ({', '.join('?' * (3 + len(ARRAY_COLUMNS)))})",
+        rows
+    )
+    conn.commit()
+
+    return len(rows)
+
+
+def has_price_blobs(conn):
+    """Check whether the blob store exists and has data"""
+    row = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'price_blobs'"
+    ).fetchone()
+    return bool(row) and conn.execute("SELECT COUNT(*) FROM price_blobs").fetchone()[0] > 0
+
+
+def read_price_blobs(conn, symbols=None):
+    """Read the blob store into a panel without parsing individual rows"""
+    sql = f"SELECT symbol, n_rows, {', '.join(ARRAY_COLUMNS)} FROM price_blobs"
+    params = []
+    if symbols is not None:
+        sql += f" WHERE symbol IN ({', '.join('?' * len(symbols))})"
+        params = list(symbols)
+    sql += " ORDER BY symbol, year"
+
+    blobs = conn.execute(sql, params).fetchall()
+
+    names = np.array([b[0] for b in blobs], dtype=object)
+    n_rows = np.array([b[1] for b in blobs], dtype=np.int64)
+    row_offsets = np.concatenate([[0], np.cumsum(n_rows)])
+
+    # Rows are ordered by symbol, so each symbol starts where the name changes
+    is_first = np.ones(len(names), dtype=bool)
+    is_first[1:] = names[1:] != names[:-1]
+
+    panel = {
+        'symbols': names[is_first].tolist(),
+        'offsets': np.append(row_offsets[:-1][is_first], row_offsets[-1]).astype(np.int64)
+    }
+    for i, (col, dtype) in enumerate(ARRAY_COLUMNS.items()):
+        parts = [np.frombuffer(b[2 + i], dtype=dtype) for b in blobs]
+        if len(parts) == 1:
+            panel[col] = parts[0]
+        else:
+            panel[col] = np.concatenate(parts) if parts else np.array([], dtype=dtype)
+
+    return panel
+
+
+def load_price_panel(conn, use_blobs=PRICE_BLOBS):
+    """Load prices as a panel, from the blob store when enabled"""
+    if use_blobs and has_price_blobs(conn):
+        return read_price_blobs(conn)
+
+    prices_df = read_table(conn, 'stock_prices', columns=PRICE_TABLE_COLUMNS, parse_dates=True)
+    return frame_to_panel(prices_df)
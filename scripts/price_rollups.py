@@ -0,0 +1,227 @@
+# scripts/price_rollups.py
+"""
+Weekly / monthly / quarterly OHLCV rollups of stock_prices
+Aggregated on the flat price panel with reduceat (no groupby), stored in
+the sql/04 tables and updated incrementally: only the (symbol, period)
+rows touched by newly loaded daily prices are recomputed.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+import sqlite3
+import numpy as np
+import pandas as pd
+import config
+from config import SQL_DIR
+from price_arrays import PRICE_TABLE_COLUMNS, frame_to_panel
+from table_store import read_sqlite_table
+
+# Resolution -> rollup table
+ROLLUP_TABLES = {
+    'weekly': 'stock_prices_weekly',
+    'monthly': 'stock_prices_monthly',
+    'quarterly': 'stock_prices_quarterly'
+}
+
+ROLLUP_COLUMNS = ['symbol', 'period_start', 'period_end', 'open', 'high', 'low', 'close', 'volume', 'n_days']
+
+# Keep the daily prices and their rollups across the pipeline's schema reset, so a
+# reload only recomputes the rollup periods whose days changed (False: clean slate)
+KEEP_PRICE_HISTORY = getattr(config, 'KEEP_PRICE_HISTORY', True)
+PRICE_HISTORY_TABLES = ['stock_prices', 'stock_prices_compact', 'symbols', 'price_blobs'] + list(ROLLUP_TABLES.values())
+
+
+# ============================================================================
+# SCHEMA
+# ============================================================================
+
+def create_rollup_schema(conn):
+    """Create the rollup tables (kept between runs)"""
+    with open(os.path.join(SQL_DIR, '04_price_rollups.sql'), 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+
+def schema_without(schema_sql, tables):
+    """
+    A schema script without the DROP TABLE / CREATE TABLE / CREATE INDEX
+    statements of the given tables (views and other tables are untouched)
+    """
+    pattern = re.compile(
+        r'^\s*(?:DROP\s+TABLE\s+IF\s+EXISTS|CREATE\s+TABLE(?:\s+IF\s+NOT\s+EXISTS)?'
+        r'|CREATE\s+(?:UNIQUE\s+)?INDEX(?:\s+IF\s+NOT\s+EXISTS)?\s+\w+\s+ON)\s+"?(\w+)',
+        re.IGNORECASE | re.MULTILINE
+    )
+    skip = set(tables)
+
+    statements, current = [], ''
+    for line in schema_sql.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            match = pattern.search(current)
+            if not (match and match.group(1) in skip):
+                statements.append(current)
+            current = ''
+
+    return ''.join(statements) + current
+
+
+# ============================================================================
+# AGGREGATION
+# ============================================================================
+
+def period_starts(dates, resolution):
+    """First calendar day of each date's week (Monday), month or quarter"""
+    days = np.asarray(dates, dtype='datetime64[D]')
+
+    if resolution == 'weekly':
+        # 1970-01-01 was a Thursday: (day + 3) % 7 is 0 on Mondays
+        return days - (days.astype(np.int64) + 3) % 7
+    if resolution == 'monthly':
+        return days.astype('datetime64[M]').astype('datetime64[D]')
+    if resolution == 'quarterly':
+        months = days.astype('datetime64[M]').astype(np.int64)
+        return (months - months % 3).astype('datetime64[M]').astype('datetime64[D]')
+
+    raise ValueError(f"Unknown rollup resolution: {resolution}")
+
+
+def rollup_panel(panel, resolution):
+    """OHLCV per symbol and period from a price panel"""
+    n = len(panel['close'])
+    columns = {col: [] for col in ROLLUP_COLUMNS}
+    if n == 0:
+        return pd.DataFrame(columns)
+
+    period = period_starts(panel['date'], resolution)
+
+    # A group starts at every symbol boundary and every period change
+    is_start = np.zeros(n, dtype=bool)
+    is_start[panel['offsets'][:-1][np.diff(panel['offsets']) > 0]] = True
+    is_start[1:] |= period[1:] != period[:-1]
+    starts = np.flatnonzero(is_start)
+    ends = np.append(starts[1:], n) - 1
+
+    symbol_idx = np.searchsorted(panel['offsets'], starts, side='right') - 1
+    volume = np.where(np.isnan(panel['volume']), 0.0, panel['volume'])
+
+    return pd.DataFrame({
+        'symbol': np.asarray(panel['symbols'], dtype=object)[symbol_idx],
+        'period_start': period[starts].astype(str),
+        'period_end': panel['date'][ends].astype('datetime64[D]').astype(str),
+        'open': panel['open'][starts],
+        'high': np.fmax.reduceat(panel['high'], starts),
+        'low': np.fmin.reduceat(panel['low'], starts),
+        'close': panel['close'][ends],
+        'volume': np.add.reduceat(volume, starts),
+        'n_days': ends - starts + 1
+    })
+
+
+# ============================================================================
+# INCREMENTAL UPDATE
+# ============================================================================
+
+def table_exists(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+
+
+def trading_days(dates):
+    """Dates as tz-naive midnight timestamps"""
+    dates = pd.to_datetime(dates)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates.dt.normalize()
+
+
+def changed_prices(conn, prices_df, replace=True):
+    """
+    Daily rows (symbol, date) that loading prices_df will add, change or remove
+    Call before writing. replace=True: stock_prices is replaced by prices_df,
+    so stored days missing from it count as removed; False: upsert (nothing removed)
+    """
+    new = prices_df[['symbol', 'date'] + [c for c in PRICE_TABLE_COLUMNS[2:] if c in prices_df.columns]].copy()
+    new['date'] = trading_days(new['date'])
+
+    if not table_exists(conn, 'stock_prices'):
+        return new[['symbol', 'date']]
+
+    symbols = None if replace else sorted(new['symbol'].unique())
+    old = read_sqlite_table(conn, 'stock_prices', columns=PRICE_TABLE_COLUMNS, symbols=symbols, date_columns=['date'])
+    old['date'] = trading_days(old['date'])
+
+    merged = new.merge(old, on=['symbol', 'date'], how='outer' if replace else 'left',
+                       suffixes=('', '_old'), indicator=True)
+    values = [c for c in PRICE_TABLE_COLUMNS[2:] if c in new.columns]
+    differs = np.zeros(len(merged), dtype=bool)
+    for col in values:
+        a, b = merged[col].to_numpy(dtype=np.float64), merged[f'{col}_old'].to_numpy(dtype=np.float64)
+        differs |= ~((a == b) | (np.isnan(a) & np.isnan(b)))
+
+    return merged.loc[(merged['_merge'] != 'both') | differs, ['symbol', 'date']].reset_index(drop=True)
+
+
+def update_rollups(conn, new_prices=None, resolutions=ROLLUP_TABLES):
+    """
+    Bring the rollup tables up to date with stock_prices (always read from SQLite)
+    new_prices: daily rows just added, changed or removed (symbol, date), see
+    changed_prices(); only periods from each symbol's earliest such day are
+    recomputed. None (or empty rollup tables) rebuilds everything. Rows of
+    symbols no longer in stock_prices are deleted.
+    Returns {resolution: rows written}
+    """
+    create_rollup_schema(conn)
+
+    empty = any(
+        conn.execute(f"SELECT COUNT(*) FROM {ROLLUP_TABLES[r]}").fetchone()[0] == 0 for r in resolutions
+    )
+    full = new_prices is None or empty
+
+    if full:
+        prices = read_sqlite_table(conn, 'stock_prices', columns=PRICE_TABLE_COLUMNS, date_columns=['date'])
+    else:
+        symbols = sorted(new_prices['symbol'].unique())
+        prices = read_sqlite_table(conn, 'stock_prices', columns=PRICE_TABLE_COLUMNS, symbols=symbols,
+                                   date_columns=['date']) if symbols else None
+        # Earliest touched day per symbol; periods starting before it are unchanged
+        first_new = pd.to_datetime(new_prices['date']).groupby(new_prices['symbol']).min()
+
+    panel = frame_to_panel(prices) if prices is not None else None
+
+    written = {}
+    for resolution in resolutions:
+        table = ROLLUP_TABLES[resolution]
+        conn.execute(f"DELETE FROM {table} WHERE symbol NOT IN (SELECT DISTINCT symbol FROM stock_prices)")
+
+        if panel is None:
+            written[resolution] = 0
+            continue
+        rollup = rollup_panel(panel, resolution)
+
+        if full:
+            conn.execute(f"DELETE FROM {table}")
+        else:
+            # Touched periods are rewritten from scratch (some may have lost all their days)
+            first_period = pd.Series(
+                period_starts(first_new.to_numpy(dtype='datetime64[ns]'), resolution).astype(str),
+                index=first_new.index
+            )
+            conn.executemany(
+                f"DELETE FROM {table} WHERE symbol = ? AND period_start >= ?",
+                first_period.items()
+            )
+            rollup = rollup[rollup['period_start'].to_numpy(dtype=str)
+                            >= rollup['symbol'].map(first_period).to_numpy(dtype=str)]
+
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(ROLLUP_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(ROLLUP_COLUMNS))})",
+            rollup[ROLLUP_COLUMNS].itertuples(index=False, name=None)
+        )
+        written[resolution] = len(rollup)
+
+    conn.commit()
+
+    return written
@@ -0,0 +1,274 @@
+# scripts/table_store.py
+"""
+Table storage backends
+SQLite (default) or a Parquet data lake partitioned by symbol and year.
+Readers go through read_table() so the backend is a config switch.
+SQLite reads are fetched as Arrow record batches (ADBC) when available.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shutil
+import pandas as pd
+import config
+from config import PROCESSED_DATA_DIR
+
+# 'sqlite' (default) or 'parquet'
+STORAGE_BACKEND = getattr(config, 'STORAGE_BACKEND', 'sqlite')
+PARQUET_DIR = getattr(config, 'PARQUET_DIR', os.path.join(PROCESSED_DATA_DIR, 'parquet'))
+PARQUET_COMPRESSION = getattr(config, 'PARQUET_COMPRESSION', 'zstd')
+
+# Tables kept in the Parquet store -> date column used for the year partition
+PARQUET_TABLES = {
+    'stock_prices': 'date',
+    'earnings_dates': 'date',
+    'earnings_analysis': 'earnings_date'
+}
+
+# Tables whose 'year' column is real data (elsewhere it only exists as a partition key)
+TABLES_WITH_YEAR = {'earnings_analysis'}
+
+# Date columns stored as text, decoded to datetime64 on request
+DATE_COLUMNS = {
+    'stock_prices': ['date'],
+    'earnings_dates': ['date'],
+    'earnings_analysis': ['earnings_date', 'pre_start_date', 'post_end_date'],
+    'benchmark_prices': ['date']
+}
+
+ROWS_PER_GROUP = 128 * 1024
+BATCH_ROWS = 64 * 1024
+
+
+# ============================================================================
+# ARROW HELPERS
+# ============================================================================
+
+def decode_dates(table, date_columns):
+    """Cast ISO date/datetime text columns of an Arrow table to timestamps"""
+    import pyarrow as pa
+
+    for col in date_columns or []:
+        if col in table.column_names and not pa.types.is_timestamp(table.schema.field(col).type):
+            i = table.column_names.index(col)
+            table = table.set_column(i, col, table[col].cast(pa.timestamp('ns')))
+            # pandas metadata would turn the column back into text
+            table = table.replace_schema_metadata(None)
+
+    return table
+
+
+def parse_date_columns(df, date_columns):
+    """pandas fallback for decode_dates"""
+    for col in date_columns or []:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format='ISO8601')
+    return df
+
+
+def arrow_to_pandas(table, date_columns=None):
+    """Convert an Arrow table to pandas, decoding dates first"""
+    try:
+        return decode_dates(table, date_columns).to_pandas()
+    except Exception:
+        return parse_date_columns(table.to_pandas(), date_columns)
+
+
+# ============================================================================
+# PARQUET
+# ============================================================================
+
+def write_parquet_table(df, table, root=PARQUET_DIR, replace=True):
+    """
+    Write a table as Parquet partitioned by symbol/year (hive layout)
+    replace=False only overwrites the symbol/year partitions present in df
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    path = os.path.join(root, table)
+    if replace and os.path.exists(path):
+        shutil.rmtree(path)
+
+    df = df.copy()
+    if 'year' not in df.columns:
+        df['year'] = pd.to_datetime(df[PARQUET_TABLES[table]]).dt.year
+
+    data = pa.Table.from_pandas(df, preserve_index=False)
+    file_format = ds.ParquetFileFormat()
+
+    ds.write_dataset(
+        data,
+        base_dir=path,
+        format=file_format,
+        partitioning=['symbol', 'year'],
+        partitioning_flavor='hive',
+        existing_data_behavior='delete_matching',
+        max_rows_per_group=ROWS_PER_GROUP,
+        file_options=file_format.make_write_options(
+            compression=PARQUET_COMPRESSION,
+            write_statistics=True
+        )
+    )
+
+    return path
+
+
+def iter_parquet_batches(table, batch_rows=BATCH_ROWS, root=PARQUET_DIR):
+    """Yield a Parquet table as Arrow record batches (partition by partition)"""
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(os.path.join(root, table), format='parquet', partitioning='hive')
+    columns = [c for c in dataset.schema.names if c != 'year' or table in TABLES_WITH_YEAR]
+
+    yield from dataset.to_batches(columns=columns, batch_size=batch_rows)
+
+
+def read_parquet_table(table, columns=None, symbols=None, years=None, date_columns=None, root=PARQUET_DIR):
+    """
+    Read a Parquet table
+    symbol/year filters prune whole partitions, other columns are not read
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(os.path.join(root, table), format='parquet', partitioning='hive')
+
+    condition = None
+    if symbols is not None:
+        condition = ds.field('symbol').isin(list(symbols))
+    if years is not None:
+        year_filter = ds.field('year').isin([int(y) for y in years])
+        condition = year_filter if condition is None else condition & year_filter
+
+    if columns is None:
+        columns = [c for c in dataset.schema.names
+                   if c != 'year' or table in TABLES_WITH_YEAR]
+
+    df = arrow_to_pandas(dataset.to_table(columns=list(columns), filter=condition), date_columns)
+
+    if 'symbol' in df.columns:
+        df['symbol'] = df['symbol'].astype(str)
+
+    return df
+
+
+# ============================================================================
+# SQLITE
+# ============================================================================
+
+def sqlite_path(conn):
+    """File path of a sqlite3 connection's main database (None for in-memory)"""
+    row = conn.execute("PRAGMA database_list").fetchone()
+    return row[2] if row and row[2] else None
+
+
+def iter_query_batches(conn, sql, params=None, batch_rows=BATCH_ROWS, use_adbc=True):
+    """
+    Yield query results as Arrow record batches
+    Uses the ADBC SQLite driver (columnar, no per-cell Python objects),
+    falling back to chunked pd.read_sql when it is not installed
+    """
+    import pyarrow as pa
+
+    path = sqlite_path(conn)
+    try:
+        import adbc_driver_sqlite.dbapi as adbc
+    except ImportError:
+        adbc = None
+    if not use_adbc:
+        adbc = None
+
+    if adbc is not None and path is not None:
+        with adbc.connect(path) as adbc_conn, adbc_conn.cursor() as cur:
+            cur.adbc_statement.set_options(**{'adbc.sqlite.query.batch_rows': str(batch_rows)})
+            cur.execute(sql, params or None)
+            yield from cur.fetch_record_batch()
+        return
+
+    for chunk in pd.read_sql(sql, conn, params=params, chunksize=batch_rows):
+        yield pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+
+
+def read_query(conn, sql, params=None, date_columns=None):
+    """Run a query and return a DataFrame built from Arrow batches"""
+    import pyarrow as pa
+
+    try:
+        batches = list(iter_query_batches(conn, sql, params))
+    except Exception:
+        # e.g. a column whose SQLite type changes mid-table
+        batches = []
+
+    if not batches:
+        return parse_date_columns(pd.read_sql(sql, conn, params=params), date_columns)
+
+    return arrow_to_pandas(pa.Table.from_batches(batches), date_columns)
+
+
+def build_select(table, columns=None, symbols=None, years=None):
+    """Build a projected/filtered SELECT for a table, returns (sql, params)"""
+    select = ', '.join(f'"{c}"' for c in columns) if columns else '*'
+
+    where = []
+    params = []
+    if symbols is not None:
+        where.append(f"symbol IN ({', '.join('?' * len(symbols))})")
+        params.extend(symbols)
+    if years is not None:
+        date_col = PARQUET_TABLES.get(table, 'date')
+        where.append(f"substr({date_col}, 1, 4) IN ({', '.join('?' * len(years))})")
+        params.extend(str(y) for y in years)
+
+    sql = f"SELECT {select} FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+
+    return sql, params
+
+
+def read_sqlite_table(conn, table, columns=None, symbols=None, years=None, date_columns=None):
+    """Read a SQLite table with optional projection and symbol/year filters"""
+    sql, params = build_select(table, columns, symbols, years)
+    return read_query(conn, sql, params, date_columns)
+
+
+# ============================================================================
+# BACKEND-NEUTRAL API
+# ============================================================================
+
+def uses_parquet(table, backend=STORAGE_BACKEND):
+    """True if this table is served from the Parquet store"""
+    return backend == 'parquet' and table in PARQUET_TABLES
+
+
+def read_table(conn, table, columns=None, symbols=None, years=None,
+               parse_dates=False, backend=STORAGE_BACKEND):
+    """
+    Read a table from the configured backend
+    columns: projection, symbols/years: filters,
+    parse_dates: decode the table's DATE_COLUMNS to datetime64
+    """
+    date_columns = DATE_COLUMNS.get(table) if parse_dates else None
+
+    if uses_parquet(table, backend):
+        return read_parquet_table(table, columns, symbols, years, date_columns)
+
+    return read_sqlite_table(conn, table, columns, symbols, years, date_columns)
+
+
+def iter_table_batches(conn, table, batch_rows=BATCH_ROWS, use_adbc=True, backend=STORAGE_BACKEND):
+    """Yield a whole table from the configured backend as Arrow record batches"""
+    if uses_parquet(table, backend):
+        return iter_parquet_batches(table, batch_rows)
+
+    return iter_query_batches(conn, f"SELECT * FROM {table}", batch_rows=batch_rows, use_adbc=use_adbc)
+
+
+def save_table(df, table, conn, backend=STORAGE_BACKEND):
+    """Save a table to SQLite and, when enabled, to the Parquet store"""
+    df.to_sql(table, conn, if_exists='replace', index=False)
+
+    if uses_parquet(table, backend):
+        write_parquet_table(df, table)
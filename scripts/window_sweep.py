@@ -0,0 +1,120 @@
+# scripts/window_sweep.py
+"""
+Pre/post window sensitivity sweep
+Returns for a whole grid of (pre, post) horizons in one pass: log prices are
+the prefix sums of daily log returns, so every window is one difference.
+Result is a long table (one row per event x pre x post): earnings_window_sweep
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import config
+from price_arrays import locate_events, load_price_panel
+from table_store import read_table, save_table
+
+# Compute the sweep in the pipeline after calculate_all_metrics
+WINDOW_SWEEP = getattr(config, 'WINDOW_SWEEP', False)
+SWEEP_PRE_DAYS = getattr(config, 'SWEEP_PRE_DAYS', (1, 3, 5, 10, 20))
+SWEEP_POST_DAYS = getattr(config, 'SWEEP_POST_DAYS', (1, 3, 5, 10, 20))
+
+SWEEP_TABLE = 'earnings_window_sweep'
+
+
+# ============================================================================
+# SWEEP
+# ============================================================================
+
+def window_returns(panel, symbols, event_dates, pre_grid=SWEEP_PRE_DAYS, post_grid=SWEEP_POST_DAYS):
+    """
+    Returns (%) of every event for every (pre, post) horizon
+    Same windows as calculate_all_metrics: day 0 is the first trading day
+    on/after the announcement, pre = close[-1] vs close[-pre-1],
+    post = close[+post] vs close[0], total = close[+post] vs close[-pre-1].
+    As in the metrics, a post window that runs one day past the symbol's
+    history ends on its last day; other windows that do not fit are NaN.
+    Returns dict of (n_events, n_pre, n_post) arrays
+    """
+    loc = locate_events(panel, symbols, event_dates)
+    day0, start, end = loc['pos'], loc['start'], loc['end']
+    n_after = end - day0
+
+    pre = np.asarray(pre_grid, dtype=np.int64)
+    post = np.asarray(post_grid, dtype=np.int64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_close = np.log(panel['close'])
+
+    # Rows for every horizon, shape (events, n_pre) and (events, n_post)
+    pre_rows = day0[:, None] - pre[None, :] - 1
+    post_rows = day0[:, None] + np.minimum(post[None, :], n_after[:, None] - 1)
+    pre_ok = (pre_rows >= start[:, None]) & (day0 < end)[:, None]
+    post_ok = n_after[:, None] >= np.maximum(post[None, :], 1)
+
+    last = len(log_close) - 1
+    log_pre_start = log_close[np.clip(pre_rows, 0, last)]
+    log_before = log_close[np.clip(day0 - 1, 0, last)][:, None]
+    log_day0 = log_close[np.clip(day0, 0, last)][:, None]
+    log_post_end = log_close[np.clip(post_rows, 0, last)]
+
+    pre_ret = np.where(pre_ok, np.expm1(log_before - log_pre_start) * 100, np.nan)
+    post_ret = np.where(post_ok, np.expm1(log_post_end - log_day0) * 100, np.nan)
+
+    total_ok = pre_ok[:, :, None] & post_ok[:, None, :]
+    total_ret = np.where(
+        total_ok,
+        np.expm1(log_post_end[:, None, :] - log_pre_start[:, :, None]) * 100,
+        np.nan
+    )
+
+    shape = total_ret.shape
+    return {
+        'pre_return_pct': np.broadcast_to(pre_ret[:, :, None], shape),
+        'post_return_pct': np.broadcast_to(post_ret[:, None, :], shape),
+        'total_return_pct': total_ret
+    }
+
+
+def sweep_frame(events, returns, pre_grid=SWEEP_PRE_DAYS, post_grid=SWEEP_POST_DAYS):
+    """Long-format table: one row per event x pre x post"""
+    n_events = len(events)
+    n_pre, n_post = len(pre_grid), len(post_grid)
+    per_event = n_pre * n_post
+
+    df = pd.DataFrame({
+        'symbol': np.repeat(events['symbol'].to_numpy(), per_event),
+        'earnings_date': np.repeat(events['earnings_date'].astype(str).to_numpy(), per_event),
+        'pre_days': np.tile(np.repeat(np.asarray(pre_grid), n_post), n_events),
+        'post_days': np.tile(np.asarray(post_grid), n_events * n_pre)
+    })
+    for col, values in returns.items():
+        df[col] = values.reshape(-1)
+
+    return df
+
+
+def calculate_window_sweep(conn, pre_grid=SWEEP_PRE_DAYS, post_grid=SWEEP_POST_DAYS):
+    """Compute the sweep for all earnings events and save it to earnings_window_sweep"""
+    print("\n" + "="*80)
+    print("WINDOW SENSITIVITY SWEEP")
+    print("="*80)
+
+    panel = load_price_panel(conn)
+    events = read_table(conn, 'earnings_dates', columns=['symbol', 'date'], parse_dates=True)
+    events = events.rename(columns={'date': 'earnings_date'})
+    events = events[events['earnings_date'].notna()].reset_index(drop=True)
+
+    returns = window_returns(panel, events['symbol'], events['earnings_date'], pre_grid, post_grid)
+    sweep_df = sweep_frame(events, returns, pre_grid, post_grid)
+    sweep_df = sweep_df[sweep_df['total_return_pct'].notna()].reset_index(drop=True)
+
+    print(f"\n📐 Horizons: pre {list(pre_grid)} x post {list(post_grid)} days")
+    print(f"   ✅ {len(sweep_df):,} event-window rows for {len(events)} events")
+
+    save_table(sweep_df, SWEEP_TABLE, conn)
+    print(f"✅ Saved to {SWEEP_TABLE}")
+
+    return sweep_df
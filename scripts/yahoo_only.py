@@ -9,6 +9,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import sqlite3
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from config import *
@@ -16,16 +17,81 @@ from config import *
 # Import Yahoo Finance functions
 from yahoo_finance_functions import (
     collect_all_data_yahoo,
+    get_stock_prices_yahoo,
     remove_timezone
 )
+from compact_storage import (
+    PRICE_STORAGE,
+    drop_stock_prices,
+    stock_prices_type,
+    load_prices_compact
+)
+from price_arrays import (
+    PRICE_BLOBS,
+    load_price_panel,
+    locate_events,
+    write_price_blobs
+)
+from table_store import (
+    STORAGE_BACKEND,
+    read_table,
+    save_table,
+    write_parquet_table,
+    read_query
+)
+from duckdb_engine import (
+    ANALYSIS_ENGINE,
+    connect_duckdb,
+    query_arrow
+)
+from olap_cube import EarningsCube, CUBE_FILE
+from event_stats import standardize
+from fingerprint import Manifest, table_fingerprint, combine_fingerprints
+from export_engine import EXPORT_FORMAT, EXPORT_WORKERS, export_path, export_tables
+from price_rollups import (
+    KEEP_PRICE_HISTORY,
+    PRICE_HISTORY_TABLES,
+    ROLLUP_TABLES,
+    schema_without,
+    table_exists,
+    changed_prices,
+    update_rollups
+)
+from abnormal_returns import (
+    ABNORMAL_RETURNS,
+    BENCHMARK_SYMBOL,
+    load_benchmark,
+    read_benchmark,
+    market_returns,
+    market_model
+)
+from ohlc_metrics import ohlc_metrics
+from abnormal_volume import VOLUME_BASELINE_DAYS, abnormal_volume
+from event_overlap import MACRO_CALENDAR_FILE, read_macro_calendar, annotate_confounders
+from factor_model import FACTOR_MODEL, FACTOR_FILE, read_factor_file, factor_model
+from window_sweep import WINDOW_SWEEP, calculate_window_sweep
+from event_tensor import EVENT_TENSOR, build_event_tensor
+from backtest import BACKTEST, run_backtests
+from delta_export import DELTA_EXPORT, PARTITIONED_EXPORTS, export_partitioned
+from downsample import (
+    DOWNSAMPLE_EXPORT,
+    DOWNSAMPLE_METHOD,
+    DOWNSAMPLE_POINTS,
+    downsampled_paths,
+    export_downsampled
+)
 
 
 # ============================================================================
 # SQL DATABASE FUNCTIONS
 # ============================================================================
 
-def create_database():
-    """Create SQLite database and tables"""
+def create_database(keep_prices=KEEP_PRICE_HISTORY):
+    """
+    Create SQLite database and tables
+    keep_prices: keep stock_prices and its rollups from a previous run, so the
+    load can diff against them (see PRICE_HISTORY_TABLES)
+    """
     print("\n" + "="*80)
     print("CREATING SQL DATABASE")
     print("="*80)
@@ -48,6 +114,12 @@ def create_database():
     # Execute schema
     print(f"\n🔨 Creating tables...")
     try:
+        if keep_prices and table_exists(conn, 'stock_prices'):
+            print(f"   Keeping price history: {', '.join(PRICE_HISTORY_TABLES)}")
+            schema_sql = schema_without(schema_sql, PRICE_HISTORY_TABLES)
+        else:
+            # stock_prices may be the compact-layout view from a previous run
+            drop_stock_prices(conn)
         cursor.executescript(schema_sql)
         conn.commit()
         print(f"   ✅ Database schema created successfully")
@@ -67,8 +139,11 @@ def create_database():
         return None
 
 
-def load_to_sql(prices_df, earnings_df, companies_df, conn):
-    """Load all data into SQL database"""
+def load_to_sql(prices_df, earnings_df, companies_df, conn, price_storage=PRICE_STORAGE):
+    """
+    Load all data into SQL database
+    price_storage: 'table' (plain stock_prices) or 'compact' (sql/02 layout)
+    """
     print("\n" + "="*80)
     print("LOADING DATA INTO SQL DATABASE")
     print("="*80)
@@ -83,12 +158,30 @@ def load_to_sql(prices_df, earnings_df, companies_df, conn):
         
         # 2. Load stock prices
         print(f"\n2️⃣ Loading stock_prices table...")
-        if not prices_df.empty:
+        # Days added, changed or removed by this load (the rollups only recompute their periods);
+        # switching a plain table to the compact layout starts the compact tables empty, so rebuild
+        price_changes = None
+        if not prices_df.empty and not (price_storage == 'compact' and stock_prices_type(conn) == 'table'):
+            price_changes = changed_prices(conn, prices_df, replace=price_storage != 'compact')
+        if not prices_df.empty and price_storage == 'compact':
+            loaded = load_prices_compact(prices_df, conn)
+            print(f"   ✅ Loaded {loaded:,} price records (compact layout)")
+        elif not prices_df.empty:
             prices_clean = prices_df.copy()
             prices_clean['date'] = prices_clean['date'].astype(str)
+            # A kept stock_prices may be the compact-layout view
+            drop_stock_prices(conn)
             prices_clean.to_sql('stock_prices', conn, if_exists='replace', index=False)
             print(f"   ✅ Loaded {len(prices_clean):,} price records")
         
+        if not prices_df.empty and PRICE_BLOBS:
+            blobs = write_price_blobs(prices_df, conn)
+            print(f"   ✅ Wrote {blobs} symbol-year price blobs")
+        
+        if not prices_df.empty:
+            written = update_rollups(conn, price_changes)
+            print(f"   ✅ Updated rollups: " + ', '.join(f"{res} {n:,}" for res, n in written.items()))
+        
         # 3. Load earnings dates
         print(f"\n3️⃣ Loading earnings_dates table...")
         if not earnings_df.empty:
@@ -97,6 +190,15 @@ def load_to_sql(prices_df, earnings_df, companies_df, conn):
             earnings_clean.to_sql('earnings_dates', conn, if_exists='replace', index=False)
             print(f"   ✅ Loaded {len(earnings_clean)} earnings events")
         
+        # 4. Mirror fact tables to the Parquet store
+        if STORAGE_BACKEND == 'parquet':
+            print(f"\n4️⃣ Writing Parquet store...")
+            if not prices_df.empty:
+                write_parquet_table(prices_df, 'stock_prices')
+            if not earnings_df.empty:
+                write_parquet_table(earnings_df, 'earnings_dates')
+            print(f"   ✅ Parquet tables written")
+        
         conn.commit()
         print(f"\n✅ All data loaded successfully!")
         return True
@@ -114,9 +216,9 @@ def calculate_all_metrics(conn):
     print("CALCULATING METRICS FOR ALL EARNINGS EVENTS")
     print("="*80)
     
-    # Load data from SQL
-    prices_df = pd.read_sql("SELECT * FROM stock_prices", conn)
-    earnings_df = pd.read_sql("SELECT * FROM earnings_dates", conn)
+    # Load data from SQL (prices as per-symbol arrays)
+    panel = load_price_panel(conn)
+    earnings_df = read_table(conn, 'earnings_dates', parse_dates=True)
     
     print(f"\n🔍 Earnings columns: {earnings_df.columns.tolist()}")
     
@@ -131,116 +233,140 @@ def calculate_all_metrics(conn):
     
     # Convert dates and remove timezone
     print(f"\n📅 Converting dates...")
-    prices_df['date'] = pd.to_datetime(prices_df['date'].astype(str))
-    earnings_df['earnings_date'] = pd.to_datetime(earnings_df['earnings_date'].astype(str))
+    earnings_df['earnings_date'] = pd.to_datetime(earnings_df['earnings_date'])
+    earnings_df = earnings_df[earnings_df['earnings_date'].notna()].reset_index(drop=True)
     
     print(f"\n📊 Data loaded:")
-    print(f"   Prices: {len(prices_df):,} records")
+    print(f"   Prices: {len(panel['close']):,} records")
     print(f"   Earnings: {len(earnings_df)} events")
     
-    # Calculate metrics
-    all_metrics = []
-    
-    for idx, earnings_row in earnings_df.iterrows():
-        symbol = earnings_row['symbol']
-        earnings_date = earnings_row['earnings_date']
-        
-        if pd.isna(earnings_date):
-            continue
-        
-        print(f"[{idx+1}/{len(earnings_df)}] {symbol} on {earnings_date.date()}.. .", end=" ")
-        
-        # Get prices for this symbol
-        symbol_prices = prices_df[prices_df['symbol'] == symbol].copy()
-        
-        if symbol_prices.empty:
-            print("⚠️ No prices")
-            continue
-        
-        symbol_prices = symbol_prices.sort_values('date')
-        
-        # Filter by date
-        try:
-            prices_before = symbol_prices[symbol_prices['date'] < earnings_date]
-            prices_after = symbol_prices[symbol_prices['date'] >= earnings_date]
-        except Exception as e:
-            print(f"⚠️ Error:  {e}")
-            continue
-        
-        if len(prices_before) < PRE_EARNINGS_DAYS + 1 or len(prices_after) < POST_EARNINGS_DAYS: 
-            print("⚠️ Not enough data")
-            continue
-        
-        # Get windows
-        pre_window = prices_before.tail(PRE_EARNINGS_DAYS + 1)
-        post_window = prices_after.head(POST_EARNINGS_DAYS + 1)
-        
-        # Calculate returns
-        pre_return = ((pre_window.iloc[-1]['close'] - pre_window.iloc[0]['close']) / pre_window.iloc[0]['close']) * 100
-        post_return = ((post_window.iloc[-1]['close'] - post_window.iloc[0]['close']) / post_window.iloc[0]['close']) * 100
-        total_return = ((post_window.iloc[-1]['close'] - pre_window.iloc[0]['close']) / pre_window.iloc[0]['close']) * 100
-        
-        immediate_return = None
-        if len(post_window) > 1:
-            immediate_return = ((post_window.iloc[1]['close'] - post_window.iloc[0]['close']) / post_window.iloc[0]['close']) * 100
-        
-        # Reaction category
-        if immediate_return and immediate_return > 2: 
-            reaction = "Strong Positive"
-        elif immediate_return and immediate_return > 0:
-            reaction = "Positive"
-        elif immediate_return and immediate_return > -2:
-            reaction = "Negative"
-        else:
-            reaction = "Strong Negative"
-        
-        # EPS (Yahoo Finance columns)
-        eps_surprise_pct = None
-        if 'Surprise(%)' in earnings_row.index and pd.notna(earnings_row['Surprise(%)']):
-            eps_surprise_pct = earnings_row['Surprise(%)']
-        elif 'Reported EPS' in earnings_row.index and 'EPS Estimate' in earnings_row.index:
-            reported = earnings_row['Reported EPS']
-            estimated = earnings_row['EPS Estimate']
-            if pd.notna(reported) and pd.notna(estimated) and estimated != 0:
-                eps_surprise_pct = ((reported - estimated) / abs(estimated)) * 100
-        
-        # EPS category
-        eps_category = "Unknown"
-        if pd.notna(eps_surprise_pct):
-            if eps_surprise_pct > 5:
-                eps_category = "Beat"
-            elif eps_surprise_pct < -5:
-                eps_category = "Miss"
-            else:
-                eps_category = "In-Line"
-        
-        # Save metric
-        all_metrics.append({
-            'symbol': symbol,
-            'earnings_date': earnings_date,
-            'pre_start_date': pre_window.iloc[0]['date'],
-            'post_end_date': post_window.iloc[-1]['date'],
-            'pre_start_price': pre_window.iloc[0]['close'],
-            'earnings_price': pre_window.iloc[-1]['close'],
-            'post_end_price': post_window.iloc[-1]['close'],
-            'pre_return_pct': pre_return,
-            'post_return_pct': post_return,
-            'immediate_return_pct': immediate_return,
-            'total_return_pct': total_return,
-            'eps_surprise_pct': eps_surprise_pct,
-            'eps_category': eps_category,
-            'reaction_category': reaction,
-            'year': earnings_date.year,
-            'quarter': earnings_date.quarter,
-            'year_quarter': f"{earnings_date.year}-Q{earnings_date.quarter}",
-            'pre_days_actual': len(pre_window) - 1,
-            'post_days_actual': len(post_window) - 1
-        })
-        
-        print(f"✅ {post_return:+.1f}%")
-    
-    # Create DataFrame
-    metrics_df = pd.DataFrame(all_metrics)
+    # Locate day 0 (first trading day on/after the announcement) for every event
+    loc = locate_events(panel, earnings_df['symbol'], earnings_df['earnings_date'])
+    day0 = loc['pos']
+    n_before = day0 - loc['start']
+    n_after = loc['end'] - day0
+    
+    valid = (n_before >= PRE_EARNINGS_DAYS + 1) & (n_after >= POST_EARNINGS_DAYS)
+    print(f"\n   ⚠️ Skipped {(~valid).sum()} events (no prices / not enough data)")
+    
+    earnings_df = earnings_df[valid].reset_index(drop=True)
+    day0 = day0[valid]
+    n_after = n_after[valid]
+    
+    # Window rows: pre window = PRE+1 days before day 0, post window = day 0 + up to POST days
+    pre_start = day0 - PRE_EARNINGS_DAYS - 1
+    earnings_idx = day0 - 1
+    post_len = np.minimum(POST_EARNINGS_DAYS + 1, n_after)
+    post_end = day0 + post_len - 1
+    
+    close = panel['close']
+    dates = panel['date']
+    
+    # Calculate returns
+    pre_return = (close[earnings_idx] - close[pre_start]) / close[pre_start] * 100
+    post_return = (close[post_end] - close[day0]) / close[day0] * 100
+    total_return = (close[post_end] - close[pre_start]) / close[pre_start] * 100
+    
+    next_day = np.minimum(day0 + 1, len(close) - 1)
+    immediate_return = np.where(
+        post_len > 1,
+        (close[next_day] - close[day0]) / close[day0] * 100,
+        np.nan
+    )
+    
+    # Reaction category (a missing or exactly zero reaction counts as Strong Negative)
+    reaction = np.select(
+        [immediate_return > 2, immediate_return > 0, (immediate_return > -2) & (immediate_return != 0)],
+        ["Strong Positive", "Positive", "Negative"],
+        default="Strong Negative"
+    )
+    
+    # EPS (Yahoo Finance columns)
+    eps_surprise_pct = pd.Series(np.nan, index=earnings_df.index)
+    if 'Reported EPS' in earnings_df.columns and 'EPS Estimate' in earnings_df.columns:
+        reported = earnings_df['Reported EPS']
+        estimated = earnings_df['EPS Estimate']
+        computed = (reported - estimated) / estimated.abs() * 100
+        eps_surprise_pct = computed.where(reported.notna() & estimated.notna() & (estimated != 0))
+    if 'Surprise(%)' in earnings_df.columns:
+        eps_surprise_pct = earnings_df['Surprise(%)'].where(earnings_df['Surprise(%)'].notna(), eps_surprise_pct)
+    
+    # EPS category
+    eps_category = np.select(
+        [eps_surprise_pct > 5, eps_surprise_pct < -5, eps_surprise_pct.notna()],
+        ["Beat", "Miss", "In-Line"],
+        default="Unknown"
+    )
+    
+    earnings_date = earnings_df['earnings_date']
+    
+    metrics_df = pd.DataFrame({
+        'symbol': earnings_df['symbol'],
+        'earnings_date': earnings_date,
+        'pre_start_date': dates[pre_start],
+        'post_end_date': dates[post_end],
+        'pre_start_price': close[pre_start],
+        'earnings_price': close[earnings_idx],
+        'post_end_price': close[post_end],
+        'pre_return_pct': pre_return,
+        'post_return_pct': post_return,
+        'immediate_return_pct': immediate_return,
+        'total_return_pct': total_return,
+        'eps_surprise_pct': eps_surprise_pct,
+        'eps_category': eps_category,
+        'reaction_category': reaction,
+        'year': earnings_date.dt.year.astype(np.int64),
+        'quarter': earnings_date.dt.quarter.astype(np.int64),
+        'year_quarter': earnings_date.dt.year.astype(str) + "-Q" + earnings_date.dt.quarter.astype(str),
+        'pre_days_actual': PRE_EARNINGS_DAYS,
+        'post_days_actual': post_len - 1
+    })
+    
+    # Gap, intraday range and realized volatility from open/high/low/close
+    for col, values in ohlc_metrics(panel, pre_start, day0, post_end).items():
+        metrics_df[col] = values
+    
+    # Volume on days around earnings relative to the trailing baseline
+    for col, values in abnormal_volume(panel, loc['start'][valid], loc['end'][valid], day0).items():
+        metrics_df[col] = values
+    print(f"\n📊 Abnormal volume vs {VOLUME_BASELINE_DAYS}-day baseline: "
+          f"{np.isfinite(metrics_df['baseline_volume']).sum()} events")
+    
+    # Confounders: other companies' windows and macro events inside each window
+    calendar = read_macro_calendar()
+    if calendar is None:
+        print(f"\n⚠️ Macro calendar not found: {MACRO_CALENDAR_FILE} (only overlapping earnings are flagged)")
+    confounders = annotate_confounders(metrics_df['symbol'], metrics_df['pre_start_date'],
+                                       metrics_df['post_end_date'], calendar)
+    for col, values in confounders.items():
+        metrics_df[col] = values
+    print(f"\n🧹 Clean events (no overlapping earnings or macro events): "
+          f"{confounders['is_clean'].sum()} of {len(metrics_df)}")
+    
+    # Market-model abnormal returns against the benchmark
+    benchmark = read_benchmark(conn) if ABNORMAL_RETURNS else None
+    if benchmark is not None:
+        print(f"\n📈 Market model vs {BENCHMARK_SYMBOL}...")
+        abnormal = market_model(
+            panel, market_returns(panel, benchmark), loc['start'][valid], pre_start, day0, post_end
+        )
+        for col, values in abnormal.items():
+            metrics_df[col] = values
+        print(f"   ✅ Estimated alpha/beta for {np.isfinite(abnormal['beta']).sum()} events")
+    
+    # Multi-factor abnormal returns from the local factor file
+    factor_file = read_factor_file() if FACTOR_MODEL else None
+    if FACTOR_MODEL and factor_file is None:
+        print(f"\n⚠️ Factor file not found: {FACTOR_FILE}")
+    if factor_file is not None:
+        factors, names, risk_free = factor_file
+        print(f"\n📐 Factor model ({', '.join(names)})...")
+        adjusted = factor_model(
+            panel, factors, names, risk_free, loc['start'][valid], pre_start, day0, post_end
+        )
+        for col, values in adjusted.items():
+            metrics_df[col] = values
+        print(f"   ✅ Estimated loadings for {np.isfinite(adjusted['factor_alpha_pct']).sum()} events")
     
     if not metrics_df.empty:
         print(f"\n✅ Calculated {len(metrics_df)} earnings events")
@@ -250,42 +376,123 @@ def calculate_all_metrics(conn):
         metrics_df['pre_start_date'] = metrics_df['pre_start_date'].astype(str)
         metrics_df['post_end_date'] = metrics_df['post_end_date'].astype(str)
         
-        metrics_df.to_sql('earnings_analysis', conn, if_exists='replace', index=False)
+        save_table(metrics_df, 'earnings_analysis', conn)
         print(f"✅ Saved to database")
     
     return metrics_df
 
 
-def export_for_powerbi(conn):
-    """Export clean CSV files for Power BI"""
+def export_for_powerbi(conn, force=False, fmt=EXPORT_FORMAT, workers=EXPORT_WORKERS, delta=DELTA_EXPORT,
+                       downsample=DOWNSAMPLE_EXPORT):
+    """
+    Export clean files for Power BI (fmt: 'csv', 'parquet' or 'feather')
+    Tables are streamed in chunks and exported in parallel.
+    A file is only rewritten when its table's fingerprint changed (or force=True).
+    delta=True writes large tables as month/quarter partitions and only
+    rewrites the partitions that changed (see delta_export.py).
+    downsample=True adds chart-sized price files (see downsample.py)
+    """
     print("\n" + "="*80)
     print("EXPORTING DATA FOR POWER BI")
     print("="*80)
     
     tables = ['companies', 'stock_prices', 'earnings_dates', 'earnings_analysis']
+    fingerprints = {table: table_fingerprint(conn, table) for table in tables + list(ROLLUP_TABLES.values())}
+    # Rollup tables only exist once prices have been loaded
+    tables += [table for table in ROLLUP_TABLES.values() if fingerprints[table] is not None]
+    partitioned = [table for table in tables if delta and table in PARTITIONED_EXPORTS]
+    manifest = Manifest()
+    
+    stale = [
+        table for table in tables
+        if table not in partitioned and (
+            force or not manifest.is_fresh(export_path(table, POWERBI_DATA_DIR, fmt), fingerprints[table])
+        )
+    ]
+    results = export_tables(conn, stale, POWERBI_DATA_DIR, fmt, workers)
     
     for table in tables:
+        if table in partitioned:
+            print(f"\n📤 Exporting {table} (delta)...")
+            try:
+                delta_result = export_partitioned(conn, table, POWERBI_DATA_DIR, fmt, workers, force)
+                print(f"   ✅ Partitions written: {len(delta_result['written'])} "
+                      f"({delta_result['rows']:,} rows), unchanged: {delta_result['unchanged']}, "
+                      f"removed: {len(delta_result['removed'])}")
+                for key, error in delta_result['failed'].items():
+                    print(f"   ⚠️ Partition {key} failed: {error}")
+            except Exception as e:
+                print(f"   ⚠️ Skipping {table}: {e}")
+            continue
+        
         print(f"\n📤 Exporting {table}...")
+        output_file = export_path(table, POWERBI_DATA_DIR, fmt)
+        result = results.get(table)
+        if table not in results:
+            print(f"   ⏭️ Unchanged: {output_file}")
+        elif isinstance(result, Exception):
+            print(f"   ⚠️ Skipping {table}: {result}")
+        else:
+            manifest.record(output_file, fingerprints[table])
+            print(f"   ✅ Saved:  {output_file}")
+            print(f"   Records: {result:,}")
+    
+    # Chart-sized price series (full resolution inside earnings windows)
+    if downsample:
+        print(f"\n📤 Exporting downsampled prices ({DOWNSAMPLE_METHOD}, {', '.join(map(str, DOWNSAMPLE_POINTS))} points)...")
         try:
-            df = pd.read_sql(f"SELECT * FROM {table}", conn)
-            output_file = os.path.join(POWERBI_DATA_DIR, f"{table}.csv")
-            df.to_csv(output_file, index=False)
+            fingerprint = combine_fingerprints(
+                fingerprints['stock_prices'], fingerprints['earnings_dates'],
+                DOWNSAMPLE_METHOD, PRE_EARNINGS_DAYS, POST_EARNINGS_DAYS
+            )
+            paths = list(downsampled_paths(POWERBI_DATA_DIR, fmt).values())
+            if not force and manifest.all_fresh(paths, fingerprint):
+                print(f"   ⏭️ Unchanged: {', '.join(os.path.basename(p) for p in paths)}")
+            else:
+                for output_file, rows in export_downsampled(conn, POWERBI_DATA_DIR, fmt).items():
+                    manifest.record(output_file, fingerprint)
+                    print(f"   ✅ Saved:  {output_file} ({rows:,} rows)")
+        except Exception as e:
+            print(f"   ⚠️ Skipping downsampled prices: {e}")
+    
+    # Pre-aggregated cube: dashboard slices sum a few hundred cells
+    print(f"\n📤 Exporting earnings cube...")
+    try:
+        output_file = os.path.join(POWERBI_DATA_DIR, CUBE_FILE)
+        fingerprint = fingerprints['earnings_analysis']
+        if not force and manifest.is_fresh(output_file, fingerprint):
+            print(f"   ⏭️ Unchanged: {output_file}")
+        else:
+            cube = EarningsCube.build(standardize(read_table(conn, 'earnings_analysis')))
+            cube.save(output_file)
+            manifest.record(output_file, fingerprint)
             print(f"   ✅ Saved:  {output_file}")
-            print(f"   Records: {len(df):,}")
-        except Exception as e: 
-            print(f"   ⚠️ Skipping {table}: {e}")
+            print(f"   Cells: {len(cube.cells):,}")
+    except Exception as e:
+        print(f"   ⚠️ Skipping cube: {e}")
+    
+    manifest.save()
     
     print(f"\n✅ All exports complete!")
     print(f"📁 Location: {POWERBI_DATA_DIR}")
 
 
-def generate_summary(conn):
-    """Generate summary statistics"""
+def generate_summary(conn, engine=ANALYSIS_ENGINE):
+    """
+    Generate summary statistics
+    engine: 'sqlite' or 'duckdb' (grouped queries come back as Arrow tables)
+    """
     print("\n" + "="*80)
     print("SUMMARY STATISTICS")
     print("="*80)
     
     cursor = conn.cursor()
+    duck = connect_duckdb() if engine == 'duckdb' else None
+    
+    def run_query(sql):
+        if duck is not None:
+            return query_arrow(duck, sql).to_pandas()
+        return read_query(conn, sql)
     
     # Overall stats
     print("\n📊 Overall Statistics:")
@@ -305,7 +512,7 @@ def generate_summary(conn):
         
         # Performance by company
         print("\n📈 Performance by Company:")
-        df = pd.read_sql("""
+        df = run_query("""
             SELECT 
                 symbol,
                 COUNT(*) as earnings_count,
@@ -315,13 +522,13 @@ def generate_summary(conn):
             FROM earnings_analysis
             GROUP BY symbol
             ORDER BY avg_return DESC
-        """, conn)
+        """)
         
         print(df.to_string(index=False))
         
         # Reaction categories
         print("\n📊 Reaction Categories:")
-        df = pd.read_sql("""
+        df = run_query("""
             SELECT 
                 reaction_category,
                 COUNT(*) as count,
@@ -329,7 +536,7 @@ def generate_summary(conn):
             FROM earnings_analysis
             GROUP BY reaction_category
             ORDER BY avg_return DESC
-        """, conn)
+        """)
         
         print(df.to_string(index=False))
         
@@ -373,8 +580,18 @@ def main():
         conn.close()
         return
     
+    # Step 3b: Benchmark for market-model abnormal returns
+    if ABNORMAL_RETURNS:
+        load_benchmark(get_stock_prices_yahoo(BENCHMARK_SYMBOL), conn)
+    
     # Step 4: Calculate metrics
     metrics_df = calculate_all_metrics(conn)
+    if WINDOW_SWEEP:
+        calculate_window_sweep(conn)
+    if EVENT_TENSOR:
+        build_event_tensor(conn)
+    if BACKTEST:
+        run_backtests(conn)
     
     # Step 5: Export for Power BI
     export_for_powerbi(conn)
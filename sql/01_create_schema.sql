@@ -13,6 +13,13 @@ DROP VIEW IF EXISTS v_company_overview;
 DROP TABLE IF EXISTS earnings_analysis;
 DROP TABLE IF EXISTS earnings_dates;
 DROP TABLE IF EXISTS stock_prices;
+DROP TABLE IF EXISTS stock_prices_compact;
+DROP TABLE IF EXISTS symbols;
+DROP TABLE IF EXISTS price_blobs;
+DROP TABLE IF EXISTS stock_prices_weekly;
+DROP TABLE IF EXISTS stock_prices_monthly;
+DROP TABLE IF EXISTS stock_prices_quarterly;
+DROP TABLE IF EXISTS benchmark_prices;
 DROP TABLE IF EXISTS companies;
 
 -- ============================================================================
@@ -89,10 +96,43 @@ CREATE TABLE earnings_analysis (
     year_quarter TEXT,
     pre_days_actual INTEGER,
     post_days_actual INTEGER,
+    gap_pct REAL,
+    day0_range_pct REAL,
+    atr_pre_pct REAL,
+    atr_post_pct REAL,
+    parkinson_vol_pre_pct REAL,
+    parkinson_vol_post_pct REAL,
+    gk_vol_pre_pct REAL,
+    gk_vol_post_pct REAL,
+    baseline_volume REAL,
+    volume_ratio_m5 REAL,
+    volume_ratio_m4 REAL,
+    volume_ratio_m3 REAL,
+    volume_ratio_m2 REAL,
+    volume_ratio_m1 REAL,
+    volume_ratio_0 REAL,
+    volume_ratio_p1 REAL,
+    volume_ratio_p2 REAL,
+    volume_ratio_p3 REAL,
+    volume_ratio_p4 REAL,
+    volume_ratio_p5 REAL,
+    abnormal_volume_pre_pct REAL,
+    abnormal_volume_post_pct REAL,
+    n_overlapping_events INTEGER,
+    overlapping_symbols TEXT,
+    n_macro_events INTEGER,
+    macro_events TEXT,
+    is_clean INTEGER,
+    -- Optional stages add their columns when calculate_all_metrics rewrites the table:
+    -- market model (ABNORMAL_RETURNS): alpha_pct, beta, est_sigma_pct, est_days, abnormal_immediate_pct,
+    --   abnormal_immediate_se_pct, car_pre_pct, car_post_pct, car_post_se_pct, car_total_pct
+    -- factor model (FACTOR_MODEL): factor_alpha_pct, loading_<factor> per factor in FACTOR_FILE, factor_sigma_pct,
+    --   factor_est_days, factor_abnormal_immediate_pct, factor_car_pre_pct, factor_car_post_pct, factor_car_total_pct
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE INDEX idx_earnings_analysis_symbol_date ON earnings_analysis(symbol, earnings_date);
+CREATE INDEX idx_earnings_analysis_clean ON earnings_analysis(is_clean);
 
 -- ============================================================================
 -- VIEWS
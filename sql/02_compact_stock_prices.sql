@@ -0,0 +1,49 @@
+-- sql/02_compact_stock_prices.sql
+/*
+Optional compact storage layout for stock prices
+- Symbols stored once in a dictionary table
+- Dates stored as integer day numbers (days since 1970-01-01)
+- Rows clustered on (symbol_id, day) with no hidden rowid
+A stock_prices view keeps the original columns so existing queries keep working.
+The existing stock_prices table/view is dropped from Python before this runs.
+*/
+
+-- ============================================================================
+-- TABLE: SYMBOL DICTIONARY
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS symbols (
+    symbol_id INTEGER PRIMARY KEY,
+    symbol TEXT NOT NULL UNIQUE
+);
+
+-- ============================================================================
+-- TABLE: COMPACT STOCK PRICES
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS stock_prices_compact (
+    symbol_id INTEGER NOT NULL REFERENCES symbols(symbol_id),
+    day INTEGER NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL NOT NULL,
+    volume INTEGER,
+    PRIMARY KEY (symbol_id, day)
+) WITHOUT ROWID;
+
+-- ============================================================================
+-- COMPATIBILITY VIEW
+-- ============================================================================
+
+CREATE VIEW stock_prices AS
+SELECT
+    s.symbol,
+    date(p.day * 86400, 'unixepoch') as date,
+    p.open,
+    p.high,
+    p.low,
+    p.close,
+    p.volume
+FROM stock_prices_compact p
+JOIN symbols s ON s.symbol_id = p.symbol_id;
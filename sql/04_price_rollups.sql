@@ -0,0 +1,60 @@
+-- sql/04_price_rollups.sql
+/*
+OHLCV rollups of stock_prices at weekly, monthly and quarterly resolution
+- period_start: first calendar day of the period (weeks start on Monday)
+- period_end: last trading day in the period
+- open/close: first/last trading day, high/low: extremes, volume: sum
+Maintained by scripts/price_rollups.py; only periods touched by newly
+loaded daily rows are recomputed.
+*/
+
+-- ============================================================================
+-- TABLE: WEEKLY OHLCV
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS stock_prices_weekly (
+    symbol TEXT NOT NULL,
+    period_start DATE NOT NULL,
+    period_end DATE NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    volume REAL,
+    n_days INTEGER NOT NULL,
+    PRIMARY KEY (symbol, period_start)
+) WITHOUT ROWID;
+
+-- ============================================================================
+-- TABLE: MONTHLY OHLCV
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS stock_prices_monthly (
+    symbol TEXT NOT NULL,
+    period_start DATE NOT NULL,
+    period_end DATE NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    volume REAL,
+    n_days INTEGER NOT NULL,
+    PRIMARY KEY (symbol, period_start)
+) WITHOUT ROWID;
+
+-- ============================================================================
+-- TABLE: QUARTERLY OHLCV
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS stock_prices_quarterly (
+    symbol TEXT NOT NULL,
+    period_start DATE NOT NULL,
+    period_end DATE NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    volume REAL,
+    n_days INTEGER NOT NULL,
+    PRIMARY KEY (symbol, period_start)
+) WITHOUT ROWID;